@@ -1,11 +1,272 @@
-from components.Auth import hide_pages, get_user
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+import agixtsdk
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from components.Auth import get_user, user_key
+from components.cache import TTLCache
+from components.compression import REFUSED_STATUSES, decompress, negotiation
+from components.metrics import current_page, instrument, metrics, start_metrics_server
+from components.transport import pool, request, token_hash, PooledRequests
 from Globals import getenv
 from agixtsdk import AGiXTSDK
 
+# Route every SDK call through the process-wide keep-alive session pool.
+agixtsdk.requests = PooledRequests()
+
+cache = TTLCache(
+    max_entries=int(getenv("AGIXT_CACHE_SIZE")),
+    stale_ttl=float(getenv("AGIXT_CACHE_STALE_TTL")),
+)
+prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(getenv("AGIXT_PREFETCH_WORKERS")),
+    thread_name_prefix="agixt-prefetch",
+)
+CACHE_TTL = float(getenv("AGIXT_CACHE_TTL"))
+STATIC_CACHE_TTL = float(getenv("AGIXT_STATIC_CACHE_TTL"))
+
+AGENT_READS = ["get_agents", "get_agentconfig"]
+CHAIN_READS = ["get_chains", "get_chain", "get_chain_args"]
+PROMPT_READS = ["get_prompt_categories", "get_prompts", "get_prompt", "get_prompt_args"]
+CONVERSATION_READS = ["get_conversations"]
+# Backends without the OpenAI-compatible chat endpoint answer with one of these.
+NO_STREAMING_STATUSES = {404, 405, 501}
+
+
+def sdk_method(name: str):
+    return instrument(name, getattr(AGiXTSDK, name))
+
+
+def cached(name: str, ttl: float):
+    method = sdk_method(name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (self.scope, name, args, tuple(sorted(kwargs.items())))
+        return cache.get(key, lambda: method(self, *args, **kwargs), ttl=ttl)
+
+    return wrapper
+
+
+def invalidates(name: str, reads: list):
+    method = sdk_method(name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            cache.invalidate(self.scope, reads)
+
+    return wrapper
+
+
+class AGiXTClient(AGiXTSDK):
+    """
+    AGiXT SDK with a per-user read-through cache for read-mostly metadata.
+
+    Writes drop the cached reads they affect for the same user, so edits show up
+    on the next rerun instead of after the TTL.
+    """
+
+    def __init__(self, base_uri: str = None, api_key: str = None, owner: str = None):
+        super().__init__(base_uri=base_uri, api_key=api_key)
+        self.scope = token_hash(api_key)
+        # What the user keeps across logins, such as background jobs, belongs to the
+        # user rather than to the token of one login.
+        self.owner = owner or self.scope
+
+    def invalidate(self, reads: list):
+        cache.invalidate(self.scope, reads)
+
+    def stream_chat(self, agent_name: str, prompt_name: str, prompt_args: dict):
+        """
+        Yields the agent's reply in pieces as AGiXT streams it from its OpenAI-compatible
+        chat completions endpoint, for `st.write_stream`. Backends without that endpoint
+        get a blocking `prompt_agent` call, and its whole response is yielded at once.
+        """
+        start = time.perf_counter()
+        error = True
+        message = {
+            key: value
+            for key, value in prompt_args.items()
+            if key not in ("user_input", "conversation_name")
+        }
+        message.update(
+            role="user", content=prompt_args["user_input"], prompt_name=prompt_name
+        )
+        try:
+            response = request(
+                "POST",
+                f"{self.base_uri}/v1/chat/completions",
+                headers=self.headers,
+                json={
+                    "model": agent_name,
+                    "messages": [message],
+                    "user": prompt_args.get("conversation_name"),
+                    "stream": True,
+                },
+                stream=True,
+            )
+        except requests.ConnectionError:
+            response = None
+        try:
+            if response is None or response.status_code in NO_STREAMING_STATUSES:
+                yield self.prompt_agent(
+                    agent_name=agent_name,
+                    prompt_name=prompt_name,
+                    prompt_args=prompt_args,
+                )
+                error = False
+                return
+            response.raise_for_status()
+            if not response.headers.get("Content-Type", "").startswith(
+                "text/event-stream"
+            ):
+                yield response.json()["choices"][0]["message"]["content"]
+                error = False
+                return
+            response.encoding = "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    # Read on to the end of the body so the connection can be reused.
+                    continue
+                choices = json.loads(data).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+            error = False
+        finally:
+            if response is not None:
+                response.close()
+            metrics.observe("stream_chat", time.perf_counter() - start, error=error)
+
+    def learn_body(self, agent_name: str, source: str, body, coding=None) -> str:
+        """
+        Posts a request body already encoded for AGiXT's `learn/<source>` endpoint, as
+        bytes, a file object or an iterator of chunks, without loading it in memory.
+
+        `coding` names the content coding a compressed body was compressed with. If
+        AGiXT refuses it, the body is sent again decompressed, so a compressed body
+        must be bytes or a file object. A backend that ignores Content-Encoding
+        answers with a 400 or 422, which is taken as a refusal only until the backend
+        has shown it takes the coding, so a real validation error is not sent twice.
+        """
+        url = f"{self.base_uri}/api/agent/{agent_name}/learn/{source}"
+        if coding and negotiation.coding(self.base_uri) != coding:
+            # Compressed before AGiXT turned out not to accept this coding.
+            body, coding = decompress(body, coding), None
+        headers = (
+            {**self.headers, "Content-Encoding": coding} if coding else self.headers
+        )
+        response = request("POST", url, headers=headers, data=body)
+        negotiation.advertised(self.base_uri, response.headers.get("Accept-Encoding"))
+        if coding and response.ok:
+            negotiation.confirmed(self.base_uri, coding)
+        elif (
+            coding
+            and response.status_code in REFUSED_STATUSES
+            and (
+                response.status_code == 415
+                or not negotiation.accepts(self.base_uri, coding)
+            )
+        ):
+            negotiation.refused(self.base_uri, coding)
+            response = request(
+                "POST", url, headers=self.headers, data=decompress(body, coding)
+            )
+        response.raise_for_status()
+        return response.json()["message"]
+
+    learn_body = instrument("learn_body", learn_body)
+
+    get_agents = cached("get_agents", CACHE_TTL)
+    get_agentconfig = cached("get_agentconfig", CACHE_TTL)
+    get_conversations = cached("get_conversations", CACHE_TTL)
+    get_chains = cached("get_chains", CACHE_TTL)
+    get_chain = cached("get_chain", CACHE_TTL)
+    get_chain_args = cached("get_chain_args", CACHE_TTL)
+    get_prompt_categories = cached("get_prompt_categories", CACHE_TTL)
+    get_prompts = cached("get_prompts", CACHE_TTL)
+    get_prompt = cached("get_prompt", CACHE_TTL)
+    get_prompt_args = cached("get_prompt_args", CACHE_TTL)
+    get_extensions = cached("get_extensions", STATIC_CACHE_TTL)
+    get_command_args = cached("get_command_args", STATIC_CACHE_TTL)
+    get_providers_by_service = cached("get_providers_by_service", STATIC_CACHE_TTL)
+    get_provider_settings = cached("get_provider_settings", STATIC_CACHE_TTL)
+
+    add_agent = invalidates("add_agent", AGENT_READS + CONVERSATION_READS)
+    import_agent = invalidates("import_agent", AGENT_READS + CONVERSATION_READS)
+    rename_agent = invalidates("rename_agent", AGENT_READS + CONVERSATION_READS)
+    delete_agent = invalidates("delete_agent", AGENT_READS + CONVERSATION_READS)
+    update_agent_settings = invalidates("update_agent_settings", AGENT_READS)
+    update_agent_commands = invalidates("update_agent_commands", AGENT_READS)
+    toggle_command = invalidates("toggle_command", AGENT_READS)
+    new_conversation = invalidates("new_conversation", CONVERSATION_READS)
+    rename_conversation = invalidates("rename_conversation", CONVERSATION_READS)
+    delete_conversation = invalidates("delete_conversation", CONVERSATION_READS)
+    add_chain = invalidates("add_chain", CHAIN_READS)
+    import_chain = invalidates("import_chain", CHAIN_READS)
+    rename_chain = invalidates("rename_chain", CHAIN_READS)
+    delete_chain = invalidates("delete_chain", CHAIN_READS)
+    add_step = invalidates("add_step", CHAIN_READS)
+    update_step = invalidates("update_step", CHAIN_READS)
+    move_step = invalidates("move_step", CHAIN_READS)
+    delete_step = invalidates("delete_step", CHAIN_READS)
+    add_prompt = invalidates("add_prompt", PROMPT_READS)
+    update_prompt = invalidates("update_prompt", PROMPT_READS)
+    rename_prompt = invalidates("rename_prompt", PROMPT_READS)
+    delete_prompt = invalidates("delete_prompt", PROMPT_READS)
+
+
+# Every other SDK method is only instrumented.
+for name, method in vars(AGiXTSDK).items():
+    if (
+        name.startswith("_")
+        or name == "handle_error"
+        or name in vars(AGiXTClient)
+        or not callable(method)
+        or inspect.iscoroutinefunction(method)
+    ):
+        continue
+    setattr(AGiXTClient, name, sdk_method(name))
+
+
+def prefetch(calls: dict) -> dict:
+    """
+    Run independent SDK calls concurrently and return their results by name.
+
+    `calls` maps a name to a zero-argument callable, for example
+    `{"llm": lambda: ApiClient.get_providers_by_service("llm")}`. The first
+    failing call raises, the same as it would have when called in sequence.
+    """
+    futures = {
+        name: prefetch_executor.submit(contextvars.copy_context().run, call)
+        for name, call in calls.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
 
 def get_agixt():
-    hide_pages()
+    page = os.path.basename(sys._getframe(1).f_code.co_filename)
+    current_page.set(os.path.splitext(page)[0])
+    start_metrics_server(getenv("METRICS_PORT"))
     user = get_user()
     if "token" in user:
-        return AGiXTSDK(base_uri=getenv("AGIXT_URI"), api_key=user["token"])
+        entry = pool.get(user["token"])
+        if entry.client is None:
+            entry.client = AGiXTClient(
+                base_uri=getenv("AGIXT_URI"),
+                api_key=user["token"],
+                owner=user_key(user),
+            )
+        return entry.client
     return None
@@ -12,6 +12,40 @@ def getenv(var_name: str):
         "APP_URI": "http://localhost:8501",
         "LOG_LEVEL": "INFO",
         "LOG_FORMAT": "%(asctime)s | %(levelname)s | %(message)s",
+        "AGIXT_POOL_SIZE": "128",
+        "AGIXT_POOL_IDLE_TIMEOUT": "600",
+        "AGIXT_MAX_CONNECTIONS": "10",
+        "AGIXT_CACHE_TTL": "30",
+        "AGIXT_STATIC_CACHE_TTL": "300",
+        "AGIXT_CACHE_STALE_TTL": "300",
+        "AGIXT_CACHE_SIZE": "4096",
+        "AGIXT_PREFETCH_WORKERS": "16",
+        "METRICS_PORT": "9464",
+        "AGIXT_CONNECT_TIMEOUT": "3.05",
+        "AGIXT_READ_TIMEOUT": "30",
+        "AGIXT_LONG_READ_TIMEOUT": "900",
+        "AGIXT_RETRIES": "2",
+        "AGIXT_HEDGING": "false",
+        "AGIXT_BREAKER_THRESHOLD": "5",
+        "AGIXT_BREAKER_COOLDOWN": "30",
+        "USER_CACHE_TTL": "60",
+        "USER_CACHE_SIZE": "1024",
+        "JWT_ALGORITHM": "HS256",
+        "HISTORY_PAGE_SIZE": "20",
+        "HISTORY_SYNC_PAGE_SIZE": "5",
+        "RENDER_CACHE_SIZE": "4096",
+        "JOBS_DB": os.path.join("data", "jobs.db"),
+        "JOB_WORKERS": "4",
+        "JOB_POLL_INTERVAL": "2",
+        "TRAINING_CONCURRENCY": "4",
+        "TRAINING_URL_TIMEOUT": "300",
+        "UPLOAD_CHUNK_SIZE": "1048576",
+        "UPLOAD_SPOOL_DIR": os.path.join("data", "uploaded_files"),
+        "UPLOAD_SPOOL_SIZE": "2147483648",
+        "TRAINING_LEDGER": os.path.join("data", "training.db"),
+        "INGEST_PROCESSES": "0",
+        "INGEST_TIMEOUT": "600",
+        "TRAINING_COMPRESSION": "none",
     }
     default_value = default_values[var_name] if var_name in default_values else ""
     return os.getenv(var_name, default_value)
@@ -1,4 +1,5 @@
 import streamlit as st
+from components.assets import asset_url
 from components.docs import agixt_docs
 from ApiClient import get_agixt
 
@@ -46,15 +47,15 @@ else:
     try:
         with open("./.streamlit/config.toml") as f:
             if "dark" in f.read():
-                logo = "AGiXT-gradient-light.svg"
+                logo = "logo-light"
             else:
-                logo = "AGiXT-gradient-flat.svg"
+                logo = "logo-flat"
     except:
-        logo = "AGiXT-gradient-light.svg"
+        logo = "logo-light"
     st.markdown(
         f"""
         <div style="text-align: center;">
-        <img src="https://josh-xt.github.io/AGiXT/images/{logo}" width="65%">
+        <img src="{asset_url(logo)}" width="65%">
         </div>
         """,
         unsafe_allow_html=True,
@@ -1,8 +1,19 @@
+import functools
+import urllib.parse
+from typing import NamedTuple
 from Globals import getenv
 
 
-def get_provider_info(provider):
-    providers = {
+class SSOProvider(NamedTuple):
+    name: str
+    label: str
+    icon: str
+    sso_uri: str
+
+
+@functools.lru_cache(maxsize=1)
+def get_providers():
+    return {
         "amazon": {
             "scopes": ["openid", "email", "profile"],
             "authorization_url": f"https://{getenv('AWS_USER_POOL_ID')}.auth.{getenv('AWS_REGION')}.amazoncognito.com/oauth2/authorize",
@@ -317,9 +328,45 @@ def get_provider_info(provider):
             "icon": "https://upload.wikimedia.org/wikipedia/commons/2/2e/Zendesk_logo.png",
         },
     }
+
+
+def get_provider_info(provider):
+    providers = get_providers()
     return providers[provider] if provider in providers else None
 
 
+def get_redirect_uri():
+    # Every provider redirects back to the app root, which finds the provider in the
+    # OAuth `state` parameter.
+    app_uri = getenv("APP_URI")
+    return app_uri[:-1] if app_uri.endswith("/") else app_uri
+
+
+@functools.lru_cache(maxsize=1)
+def get_sso_providers():
+    """
+    The providers shown on the login screen, those with a client ID configured, with
+    their authorization URLs built once per process from the environment.
+    """
+    redirect_uri = urllib.parse.quote(get_redirect_uri())
+    sso_providers = []
+    for provider, provider_info in get_providers().items():
+        client_id = getenv(f"{provider.upper()}_CLIENT_ID")
+        if client_id == "":
+            continue
+        client_id = urllib.parse.quote(client_id)
+        scopes = urllib.parse.quote(" ".join(provider_info["scopes"]))
+        sso_providers.append(
+            SSOProvider(
+                name=provider,
+                label=f"Continue with {provider.capitalize()}",
+                icon=provider_info["icon"],
+                sso_uri=f"{provider_info['authorization_url']}?client_id={client_id}&redirect_uri={redirect_uri}&scope={scopes}&response_type=code&access_type=offline&prompt=consent&state={provider}",
+            )
+        )
+    return tuple(sso_providers)
+
+
 def get_sso_provider(provider: str, code, redirect_uri=None):
     provider_info = get_provider_info(provider)
     if provider_info:
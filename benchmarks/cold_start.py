@@ -0,0 +1,159 @@
+"""
+Cold start profile.
+
+Runs the first script run of each page in a fresh interpreter under `python -X importtime`,
+the way the first visitor to a new replica meets it, against the local AGiXT stand-in.
+Reports the first run and a warm rerun for comparison. It also reports the imports paid
+while starting the server, and the import time of the first run per third-party package
+and per module of this repository.
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --pages pages/0-Agent_Interactions.py --top 30
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Main.py"] + [
+    os.path.join("pages", page)
+    for page in sorted(os.listdir(os.path.join(ROOT, "pages")))
+    if page[0].isdigit() and page.endswith(".py")
+]
+MARKER = "cold-start: first run"
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| \s*(\S+)")
+
+
+def child(page: str):
+    # Everything Streamlit imports before a session connects is paid while the server
+    # starts, so import it before the marker that separates it from the first run.
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+    at.query_params["token"] = "stub-token"
+    sys.stderr.write(f"{MARKER}\n")
+    sys.stderr.flush()
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    # A rerun finds the token in the browser's cookie rather than the login link.
+    from benchmarks.page_rerun import use_browser_cookie
+
+    use_browser_cookie("stub-token")
+    start = time.perf_counter()
+    at.run()
+    warm = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "first_run_ms": round(first * 1000, 1),
+                "warm_run_ms": round(warm * 1000, 1),
+                "exception": at.exception[0].value if at.exception else None,
+            }
+        )
+    )
+
+
+def parse_imports(lines: list) -> dict:
+    # Self time per module from -X importtime, summed per third-party package and kept
+    # per module for the repository's own code.
+    imports = {}
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        own, name = int(match.group(1)), match.group(2)
+        package = name.split(".")[0]
+        if not (
+            os.path.isdir(os.path.join(ROOT, package))
+            or os.path.isfile(os.path.join(ROOT, f"{package}.py"))
+        ):
+            name = package
+        imports[name] = imports.get(name, 0) + own / 1000
+    return imports
+
+
+def profile(page: str, agixt_uri: str) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, "session.txt"), "w") as f:
+            f.write("OpenAI")
+        with open(os.path.join(workdir, "conversation.txt"), "w") as f:
+            f.write("Conversation 0")
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "benchmarks.cold_start"]
+            + ["--child", page],
+            cwd=workdir,
+            env=dict(
+                os.environ,
+                PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]),
+                AGIXT_URI=agixt_uri,
+                METRICS_PORT="0",
+            ),
+            capture_output=True,
+            text=True,
+        )
+    if process.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{process.stderr[-2000:]}")
+    stderr = process.stderr.splitlines()
+    split = stderr.index(MARKER)
+    server = parse_imports(stderr[:split])
+    first_run = parse_imports(stderr[split + 1 :])
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["server_import_ms"] = sum(server.values())
+    result["first_run_import_ms"] = sum(first_run.values())
+    result["modules"] = sorted(first_run.items(), key=lambda module: -module[1])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", nargs="*", default=PAGES)
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=15,
+        help="Packages and modules to list per page, by import time.",
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    sys.path.insert(0, ROOT)
+    from stub.server import start
+
+    server = start()
+    try:
+        results = {
+            page: profile(page, f"http://127.0.0.1:{server.server_address[1]}")
+            for page in args.pages
+        }
+    finally:
+        server.shutdown()
+
+    print(
+        f"{'Page':<36} {'Server imports ms':>18} {'First run ms':>13} "
+        f"{'of which imports':>17} {'Warm run ms':>12}"
+    )
+    for page, result in results.items():
+        print(
+            f"{page:<36} {result['server_import_ms']:>18.1f} {result['first_run_ms']:>13.1f} "
+            f"{result['first_run_import_ms']:>17.1f} {result['warm_run_ms']:>12.1f}"
+        )
+    for page, result in results.items():
+        if result["exception"]:
+            print(f"\n{page} raised: {result['exception']}")
+        print(f"\nImport time during the first run of {page}:")
+        for name, own in result["modules"][: args.top]:
+            print(f"  {own:>9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Training upload compression benchmark.
+
+Learns generated corpora of Markdown prose, CSV tables, Python source and
+incompressible binary files through the same pipeline as Agent Training, against the
+local AGiXT stand-in, once per content coding. For each it reports the bytes that
+reached the stand-in and the end-to-end ingest time, with the stand-in's request bodies
+sharing a link of `--bandwidth` megabytes per second. Text files are sent both base64
+encoded to `learn/file` and as text to `learn/text`.
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --size 32 --files 16 --bandwidth 5
+"""
+
+import argparse
+import csv
+import glob
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prose(size: int, rng: random.Random) -> bytes:
+    # Words drawn with a Zipf-like distribution, in paragraphs under headings.
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    vocabulary = [
+        "".join(rng.choices(letters, weights=range(26, 0, -1), k=rng.randint(2, 9)))
+        for _ in range(5000)
+    ]
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    out = io.StringIO()
+    while out.tell() < size:
+        out.write(f"## {' '.join(rng.choices(vocabulary, weights, k=4)).title()}\n\n")
+        for _ in range(rng.randint(2, 5)):
+            sentences = [
+                " ".join(
+                    rng.choices(vocabulary, weights, k=rng.randint(6, 20))
+                ).capitalize()
+                for _ in range(rng.randint(3, 8))
+            ]
+            out.write(". ".join(sentences) + ".\n\n")
+    return out.getvalue().encode("utf-8")[:size]
+
+
+def table(size: int, rng: random.Random) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["id", "date", "region", "product", "quantity", "price"])
+    regions = ["north", "south", "east", "west", "central"]
+    row = 0
+    while out.tell() < size:
+        row += 1
+        writer.writerow(
+            [
+                row,
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                rng.choice(regions),
+                f"SKU-{rng.randint(1000, 9999)}",
+                rng.randint(1, 500),
+                f"{rng.uniform(1, 1000):.2f}",
+            ]
+        )
+    return out.getvalue().encode("utf-8")[:size]
+
+
+def source(size: int, rng: random.Random) -> bytes:
+    # This repository's own Python modules, in a shuffled order, repeated to size.
+    files = sorted(glob.glob(os.path.join(ROOT, "**", "*.py"), recursive=True))
+    out = bytearray()
+    while len(out) < size:
+        rng.shuffle(files)
+        for path in files:
+            with open(path, "rb") as file:
+                out += file.read()
+    return bytes(out[:size])
+
+
+def binary(size: int, rng: random.Random) -> bytes:
+    # Stands in for PDFs, images and archives, which are already compressed.
+    return rng.randbytes(size)
+
+
+CORPORA = {
+    "prose": (prose, ".md"),
+    "csv": (table, ".csv"),
+    "code": (source, ".txt"),
+    "binary": (binary, ".pdf"),
+}
+
+
+def write_corpus(directory: str, name: str, size: int, files: int) -> list:
+    generate, extension = CORPORA[name]
+    rng = random.Random(name)
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"{name}-{index}{extension}")
+        with open(path, "wb") as file:
+            file.write(generate(size // files, rng))
+        paths.append((os.path.basename(path), path))
+    return paths
+
+
+def ingest(ApiClient, server, files: list, coding, extract_text: bool) -> dict:
+    from components.compression import negotiation
+    from components.ingest import ingest_files
+
+    negotiation.preferred = coding
+    negotiation.accepted.clear()
+    received = server.stand_in.received_bytes
+    start = time.perf_counter()
+    errors = [
+        error
+        for _, error, _, _ in ingest_files(
+            ApiClient, "benchmark", files, "0", extract_text=extract_text
+        )
+        if error
+    ]
+    seconds = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f"Training failed: {errors[0]}")
+    return {
+        "wire_bytes": server.stand_in.received_bytes - received,
+        "seconds": seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--size", type=int, default=16, help="Megabytes of each corpus."
+    )
+    parser.add_argument(
+        "--files", type=int, default=8, help="Files each corpus is split into."
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=10,
+        help="Megabytes per second between the frontend and the stand-in.",
+    )
+    parser.add_argument("--corpora", nargs="*", default=list(CORPORA))
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.environ["METRICS_PORT"] = "0"
+    from stub.server import start
+    from ApiClient import AGiXTClient
+    from components.compression import CODINGS
+    from components.ingest import workers
+
+    server = start(upload_bandwidth=args.bandwidth)
+    ApiClient = AGiXTClient(
+        base_uri=f"http://127.0.0.1:{server.server_address[1]}", api_key="stub-token"
+    )
+    workers.start()
+    print(
+        f"{'Corpus':<8} {'Endpoint':<9} {'Coding':<9} {'Upload MB':>10} "
+        f"{'Wire MB':>9} {'of upload':>10} {'Seconds':>8} {'MB/s':>7}"
+    )
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for name in args.corpora:
+                files = write_corpus(directory, name, args.size << 20, args.files)
+                size = sum(os.path.getsize(path) for _, path in files)
+                endpoints = ["file", "text"] if name != "binary" else ["file"]
+                for endpoint in endpoints:
+                    for coding in [None, *CODINGS]:
+                        result = ingest(
+                            ApiClient, server, files, coding, endpoint == "text"
+                        )
+                        print(
+                            f"{name:<8} {endpoint:<9} {coding or 'none':<9} "
+                            f"{size / 1e6:>10.1f} {result['wire_bytes'] / 1e6:>9.1f} "
+                            f"{result['wire_bytes'] / size:>10.0%} "
+                            f"{result['seconds']:>8.2f} "
+                            f"{size / 1e6 / result['seconds']:>7.1f}"
+                        )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
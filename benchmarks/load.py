@@ -0,0 +1,438 @@
+"""
+Concurrent session load test.
+
+Starts the AGiXT stand-in and a headless Streamlit server, then simulates concurrent
+browser sessions over Streamlit's websocket protocol. Each session logs in with the
+stand-in token, opens pages, sends a chat message and edits a chain step. The run reports
+p50/p95/p99 rerun latency per step along with the CPU use and resident memory of the
+Streamlit process, which is what sizing replicas of the single Streamlit process needs.
+Needs the `websockets` package, version 13 or later.
+
+    python -m benchmarks.load --sessions 50
+    python -m benchmarks.load --url http://localhost:8501 --server-pid 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COOKIE_CALL = re.compile(r"(getCookie|setCookie)\('([^']*)'(?:, '([^']*)', \d+)?\)")
+
+
+class Session:
+    """A simulated browser tab: one websocket, the open page and its widget values."""
+
+    def __init__(self, url: str, token: str):
+        self.url = url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self.token = token
+        self.query_string = ""
+        self.cookies = {}
+        self.pages = {}
+        self.page_hash = ""
+        self.widgets = {}
+        self.fragments = {}
+        self.values = {}
+        self.answers = {}
+        self.errors = 0
+
+    async def connect(self):
+        from websockets.asyncio.client import connect
+
+        self.socket = await connect(
+            self.url, subprotocols=["streamlit"], max_size=None, open_timeout=60
+        )
+
+    async def close(self):
+        await self.socket.close()
+
+    async def rerun(self, triggers: list = (), fragment_id: str = ""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        state = message.rerun_script
+        state.query_string = self.query_string
+        state.page_script_hash = self.page_hash
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(list(self.values.values()) + list(triggers))
+        await self.socket.send(message.SerializeToString())
+        if not fragment_id:
+            # A fragment run only resends the fragment's elements.
+            self.widgets = {}
+        self.answers = {}
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.socket.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {
+                    page.page_name: page.page_script_hash
+                    for page in forward.navigation.app_pages
+                }
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self.collect(forward.delta.new_element, forward.delta.fragment_id)
+            elif (
+                kind == "script_finished"
+                and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN
+            ):
+                break
+        # A browser answers new component instances once they mount, which reruns the
+        # page; the interaction is only settled after those reruns.
+        answers = {
+            id: state for id, state in self.answers.items() if id not in self.values
+        }
+        if answers:
+            self.values.update(answers)
+            await self.rerun()
+
+    def collect(self, element, fragment_id: str = ""):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors += 1
+            return
+        if kind == "component_instance":
+            self.answer(element.component_instance)
+            return
+        widget = getattr(element, kind)
+        fields = widget.DESCRIPTOR.fields_by_name
+        if "id" in fields and "label" in fields:
+            self.widgets.setdefault((kind, widget.label), widget.id)
+            self.fragments[widget.id] = fragment_id
+
+    def answer(self, component):
+        # Stand in for the browser's cookie jar behind streamlit_js_eval's getCookie
+        # and setCookie.
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        expression = json.loads(component.json_args).get("js_expressions", "")
+        match = COOKIE_CALL.fullmatch(expression)
+        if not match:
+            return
+        call, name, value = match.groups()
+        if call == "setCookie":
+            self.cookies[name] = value
+            value = None
+        else:
+            value = self.cookies.get(name)
+        self.answers[component.id] = WidgetState(
+            id=component.id, json_value=json.dumps(value)
+        )
+
+    def state(self, kind: str, label: str, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        if (kind, label) not in self.widgets:
+            raise LookupError(f"No {kind} labelled {label!r} on the page")
+        return WidgetState(id=self.widgets[(kind, label)], **value)
+
+    async def login(self):
+        # Opens the login link; the app moves the token to a cookie and clears the URL.
+        self.query_string = f"token={self.token}"
+        await self.open()
+        self.query_string = ""
+
+    async def open(self, page: str = None):
+        self.page_hash = self.pages[page] if page else ""
+        self.values = {}
+        await self.rerun()
+
+    async def set(self, kind: str, label: str, **value):
+        state = self.state(kind, label, **value)
+        self.values[state.id] = state
+        # Like a browser, a widget inside a fragment reruns only that fragment.
+        await self.rerun(fragment_id=self.fragments.get(state.id, ""))
+
+    async def click(self, label: str):
+        state = self.state("button", label, trigger_value=True)
+        await self.rerun([state], fragment_id=self.fragments.get(state.id, ""))
+
+
+SCENARIO = [
+    ("login", lambda session: session.login()),
+    (
+        "open Agent Interactions",
+        lambda session: session.open("Agent Interactions"),
+    ),
+    (
+        "type message",
+        lambda session: session.set(
+            "text_area", "User Input", string_value="Hello from the load test"
+        ),
+    ),
+    ("send message", lambda session: session.click("Send")),
+    ("open Chain Management", lambda session: session.open("Chain Management")),
+    (
+        "modify chain",
+        lambda session: session.set("selectbox", "Action", string_value="Modify Chain"),
+    ),
+    ("edit chain step", lambda session: session.click("Modify Step")),
+]
+
+
+async def simulate(
+    url: str, token: str, iterations: int, think: float, delay: float, results: dict
+):
+    await asyncio.sleep(delay)
+    session = Session(url, token)
+    await session.connect()
+    try:
+        for _ in range(iterations):
+            for name, step in SCENARIO:
+                start = time.perf_counter()
+                try:
+                    await step(session)
+                except Exception as e:
+                    results["failures"].append(f"{name}: {e}")
+                    break
+                results["latency"].setdefault(name, []).append(
+                    time.perf_counter() - start
+                )
+                await asyncio.sleep(random.uniform(0, 2 * think))
+    finally:
+        results["errors"] += session.errors
+        await session.close()
+
+
+class ProcessSampler(threading.Thread):
+    """Samples CPU time and resident memory of a process from /proc."""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        super().__init__(name="process-sampler", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def read(self) -> tuple:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        with open(f"/proc/{self.pid}/status") as f:
+            rss = next(
+                int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:")
+            )
+        return time.monotonic(), cpu, rss
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.samples.append(self.read())
+            self.stopped.wait(self.interval)
+
+    def stop(self) -> dict:
+        self.stopped.set()
+        self.join()
+        self.samples.append(self.read())
+        (start, cpu_start, rss_start), (end, cpu_end, rss_end) = (
+            self.samples[0],
+            self.samples[-1],
+        )
+        peak_cpu = max(
+            (b[1] - a[1]) / (b[0] - a[0])
+            for a, b in zip(self.samples, self.samples[1:])
+            if b[0] > a[0]
+        )
+        return {
+            "cpu_mean": (cpu_end - cpu_start) / (end - start),
+            "cpu_peak": peak_cpu,
+            "rss_start": rss_start,
+            "rss_peak": max(rss for _, _, rss in self.samples),
+            "rss_end": rss_end,
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_streamlit(agixt_uri: str, workdir: str) -> tuple:
+    # Pages keep state in session.txt and conversation.txt in the working directory, so
+    # run from a scratch directory that carries the repository's Streamlit config.
+    if os.path.isdir(os.path.join(ROOT, ".streamlit")):
+        shutil.copytree(
+            os.path.join(ROOT, ".streamlit"), os.path.join(workdir, ".streamlit")
+        )
+    with open(os.path.join(workdir, "session.txt"), "w") as f:
+        f.write("OpenAI")
+    with open(os.path.join(workdir, "conversation.txt"), "w") as f:
+        f.write("Conversation 0")
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            os.path.join(ROOT, "Main.py"),
+            "--server.headless=true",
+            f"--server.port={port}",
+            "--browser.gatherUsageStats=false",
+        ],
+        cwd=workdir,
+        env=dict(os.environ, AGIXT_URI=agixt_uri, METRICS_PORT="0"),
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            urllib.request.urlopen(f"{url}/_stcore/health", timeout=1)
+            return process, url
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("Streamlit did not start.")
+            time.sleep(0.2)
+
+
+def percentile(samples: list, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def run_load(url: str, args) -> dict:
+    results = {"latency": {}, "failures": [], "errors": 0}
+    await asyncio.gather(
+        *[
+            simulate(
+                url,
+                args.token,
+                args.iterations,
+                args.think,
+                args.ramp * i / args.sessions,
+                results,
+            )
+            for i in range(args.sessions)
+        ]
+    )
+    return results
+
+
+def report(results: dict, resources: dict, wall: float):
+    print(f"{'Rerun':<28} {'Count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    everything = []
+    for name, _ in SCENARIO:
+        samples = results["latency"].get(name, [])
+        everything += samples
+        if samples:
+            print(
+                f"{name:<28} {len(samples):>7} "
+                + " ".join(
+                    f"{percentile(samples, q) * 1000:>9.1f}" for q in [0.5, 0.95, 0.99]
+                )
+            )
+    if everything:
+        print(
+            f"{'all reruns':<28} {len(everything):>7} "
+            + " ".join(
+                f"{percentile(everything, q) * 1000:>9.1f}" for q in [0.5, 0.95, 0.99]
+            )
+        )
+        print(f"\nThroughput: {len(everything) / wall:.1f} reruns/s over {wall:.1f}s")
+    if resources:
+        print(
+            f"Server CPU: {resources['cpu_mean'] * 100:.0f}% mean, "
+            f"{resources['cpu_peak'] * 100:.0f}% peak"
+        )
+        print(
+            f"Server RSS: {resources['rss_start'] / 2**20:.0f} MiB at start, "
+            f"{resources['rss_peak'] / 2**20:.0f} MiB peak, "
+            f"{resources['rss_end'] / 2**20:.0f} MiB at end"
+        )
+    if results["errors"]:
+        print(f"Exceptions rendered by pages: {results['errors']}")
+    if results["failures"]:
+        print(f"\nSessions that failed ({len(results['failures'])}):")
+        for failure in sorted(set(results["failures"])):
+            print(f"- {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=3,
+        help="Times each session walks through the scenario.",
+    )
+    parser.add_argument(
+        "--think",
+        type=float,
+        default=1.0,
+        help="Mean seconds a session waits between interactions.",
+    )
+    parser.add_argument(
+        "--ramp",
+        type=float,
+        default=5.0,
+        help="Seconds over which sessions connect.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds of latency injected on every stand-in route.",
+    )
+    parser.add_argument(
+        "--url",
+        help="Load an already running frontend instead of starting one.",
+    )
+    parser.add_argument(
+        "--server-pid",
+        type=int,
+        help="Process to sample CPU and memory of when using --url.",
+    )
+    parser.add_argument("--token", default="stub-token")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    server = process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            url, pid = args.url, args.server_pid
+            if not url:
+                from stub.server import start
+
+                server = start(
+                    conversations=50,
+                    messages=100,
+                    latency=[f"/*={args.latency}"] if args.latency else None,
+                )
+                process, url = start_streamlit(
+                    f"http://127.0.0.1:{server.server_address[1]}", workdir
+                )
+                pid = process.pid
+            sampler = ProcessSampler(pid) if pid else None
+            if sampler:
+                sampler.start()
+            start = time.perf_counter()
+            results = asyncio.run(run_load(url, args))
+            wall = time.perf_counter() - start
+            resources = sampler.stop() if sampler else {}
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+            if server:
+                server.shutdown()
+    report(results, resources, wall)
+    if results["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Page rerun latency benchmark.
+
+Drives every page through scripted interactions with Streamlit's AppTest against the
+local AGiXT stand-in, and records per rerun the wall time, the number of requests that
+reached AGiXT, and the bytes of delta messages sent to the browser. Results are compared
+with `benchmarks/baseline.json`, and the run fails when a rerun makes more AGiXT
+requests than the baseline or sends more delta bytes beyond the threshold. Wall time
+depends on the machine, so it is only checked with `--wall-threshold`, against a
+baseline recorded on the same machine.
+
+    python -m benchmarks.page_rerun
+    python -m benchmarks.page_rerun --update-baseline
+    python -m benchmarks.page_rerun --wall-threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def widget(at, kind: str, label: str):
+    for element in getattr(at, kind):
+        if element.label == label:
+            return element
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+
+SCENARIOS = {
+    "Main.py": [
+        ("load", lambda at: at),
+    ],
+    "pages/0-Agent_Interactions.py": [
+        ("load", lambda at: at),
+        (
+            "type message",
+            lambda at: widget(at, "text_area", "User Input").input("Hello"),
+        ),
+        ("send message", lambda at: widget(at, "button", "Send").click()),
+        (
+            "chains mode",
+            lambda at: widget(at, "selectbox", "Select Agent Interaction Mode").select(
+                "Chains"
+            ),
+        ),
+    ],
+    "pages/1-Agent_Training.py": [
+        ("load", lambda at: at),
+        (
+            "text mode",
+            lambda at: widget(at, "selectbox", "Select Training Source").select("Text"),
+        ),
+    ],
+    "pages/2-Agent_Management.py": [
+        ("load", lambda at: at),
+        (
+            "modify agent",
+            lambda at: widget(at, "selectbox", "Action").select("Modify Agent"),
+        ),
+    ],
+    "pages/3-Memory_Management.py": [
+        ("load", lambda at: at),
+    ],
+    "pages/4-Prompt_Management.py": [
+        ("load", lambda at: at),
+        (
+            "modify prompt",
+            lambda at: widget(at, "selectbox", "Action").select("Modify Prompt"),
+        ),
+    ],
+    "pages/5-Chain_Management.py": [
+        ("load", lambda at: at),
+        (
+            "modify chain",
+            lambda at: widget(at, "selectbox", "Action").select("Modify Chain"),
+        ),
+    ],
+}
+
+
+def record_delta_bytes(measurement: dict):
+    # AppTest keeps the ForwardMsgs of a run on its script runner; sum their sizes.
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    original = LocalScriptRunner.run
+
+    def run(self, *args, **kwargs):
+        tree = original(self, *args, **kwargs)
+        measurement["delta_bytes"] = sum(
+            message.ByteSize() for message in self.forward_msgs()
+        )
+        return tree
+
+    LocalScriptRunner.run = run
+
+
+def use_browser_cookie(token: str):
+    # Components such as streamlit_js_eval do not run under AppTest, so stand in for
+    # the browser's cookie jar the way a logged-in browser would answer.
+    from components import Auth
+
+    Auth.get_cookie = lambda name, component_key=None: token
+
+
+def reset_caches():
+    import ApiClient
+    from components import Auth
+
+    ApiClient.cache.entries.clear()
+    Auth.user_cache.entries.clear()
+
+
+def run_scenario(page: str, steps: list, stand_in, measurement: dict) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    with open("session.txt", "w") as f:
+        f.write("OpenAI")
+    with open("conversation.txt", "w") as f:
+        f.write("Conversation 0")
+    reset_caches()
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=60)
+    at.query_params["token"] = "stub-token"
+    results = {}
+    for name, action in steps:
+        action(at)
+        requests_before = stand_in.requests
+        start = time.perf_counter()
+        at.run()
+        wall = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{page} {name}: {at.exception[0].value}")
+        results[f"{page} :: {name}"] = {
+            "wall_ms": wall * 1000,
+            "sdk_calls": stand_in.requests - requests_before,
+            "delta_bytes": measurement.get("delta_bytes", 0),
+        }
+    return results
+
+
+def measure(pages: list, repeat: int, latency: float) -> dict:
+    from stub.server import start
+
+    server = start(
+        conversations=50,
+        messages=100,
+        latency=[f"/*={latency}"] if latency else None,
+        # Stream chat replies as fast as the app reads them; pacing would only add
+        # simulated generation time to the send rerun.
+        token_interval=0,
+    )
+    os.environ["AGIXT_URI"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["METRICS_PORT"] = "0"
+    measurement = {}
+    record_delta_bytes(measurement)
+    use_browser_cookie("stub-token")
+    runs = {}
+    for _ in range(repeat):
+        for page in pages:
+            for key, result in run_scenario(
+                page, SCENARIOS[page], server.stand_in, measurement
+            ).items():
+                runs.setdefault(key, []).append(result)
+    server.shutdown()
+    return {
+        key: {
+            "wall_ms": round(statistics.median(r["wall_ms"] for r in results), 1),
+            "sdk_calls": max(r["sdk_calls"] for r in results),
+            "delta_bytes": max(r["delta_bytes"] for r in results),
+        }
+        for key, results in runs.items()
+    }
+
+
+def compare(
+    results: dict, baseline: dict, threshold: float, wall_threshold: float = None
+) -> list:
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        if result["sdk_calls"] > base["sdk_calls"]:
+            regressions.append(
+                f"{key}: {result['sdk_calls']} AGiXT requests, baseline {base['sdk_calls']}"
+            )
+        limits = {"delta_bytes": threshold}
+        if wall_threshold is not None:
+            limits["wall_ms"] = wall_threshold
+        for metric, limit in limits.items():
+            if result[metric] > base[metric] * (1 + limit):
+                regressions.append(
+                    f"{key}: {metric} {result[metric]}, baseline {base[metric]}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", nargs="*", default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase in delta bytes.",
+    )
+    parser.add_argument(
+        "--wall-threshold",
+        type=float,
+        default=None,
+        help="Also fail on a relative increase in wall time above this. Only "
+        "meaningful against a baseline recorded on the same machine.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds of latency injected on every stand-in route.",
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Pages keep state in session.txt and conversation.txt in the working directory.
+        os.chdir(workdir)
+        try:
+            results = measure(args.pages, args.repeat, args.latency)
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'Rerun':<60} {'Wall ms':>9} {'Requests':>9} {'Delta bytes':>12}")
+    for key, result in results.items():
+        print(
+            f"{key:<60} {result['wall_ms']:>9} {result['sdk_calls']:>9} {result['delta_bytes']:>12}"
+        )
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline yet. Run with --update-baseline to record one.")
+        return
+    with open(args.baseline) as f:
+        regressions = compare(
+            results, json.load(f), args.threshold, args.wall_threshold
+        )
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"- {regression}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,17 @@
+import hashlib
 import io
-import os
 import time
-import pyotp
-import qrcode
-import requests
+import jwt
 import logging
 import streamlit as st
 from streamlit_js_eval import get_cookie, set_cookie
+from components import transport
+from components.assets import asset_url
+from components.cache import TTLCache
+from components.metrics import metrics
 from Globals import getenv
-import urllib.parse
-from OAuth2Providers import get_provider_info
+from requests.exceptions import RequestException
+from OAuth2Providers import get_provider_info, get_redirect_uri, get_sso_providers
 
 logging.basicConfig(
     level=getenv("LOG_LEVEL"),
@@ -25,6 +27,104 @@ Required environment variables:
 """
 
 
+def auth_request(method: str, name: str, url: str, **kwargs):
+    start = time.perf_counter()
+    error = True
+    try:
+        response = transport.request(method, url, **kwargs)
+        error = response.status_code >= 500
+        return response
+    finally:
+        metrics.observe(name, time.perf_counter() - start, error=error)
+
+
+class Unauthorized(Exception):
+    pass
+
+
+# A profile the server no longer returns for a token is never served from the cache.
+user_cache = TTLCache(
+    max_entries=int(getenv("USER_CACHE_SIZE")), stale_ttl=0, fatal=(Unauthorized,)
+)
+
+
+def token_claims(token: str) -> dict:
+    """
+    Checks the token locally and returns its claims, raising `jwt.InvalidTokenError`
+    for tokens that can be rejected without asking the server.
+
+    With `JWT_SECRET` set the signature and expiry are verified. Without it only the
+    expiry is checked, and tokens that are not JWTs are left to the server.
+    """
+    secret = getenv("JWT_SECRET")
+    if secret:
+        return jwt.decode(
+            token,
+            secret,
+            algorithms=[getenv("JWT_ALGORITHM")],
+            options={"verify_aud": False},
+        )
+    try:
+        return jwt.decode(
+            token, options={"verify_signature": False, "verify_exp": True}
+        )
+    except jwt.ExpiredSignatureError:
+        raise
+    except jwt.InvalidTokenError:
+        return {}
+
+
+def forget_user(token):
+    user_cache.invalidate(transport.token_hash(token), ["get_user"])
+
+
+transport.unauthorized_handlers.append(forget_user)
+
+
+def get_user_profile(token: str):
+    try:
+        claims = token_claims(token)
+    except jwt.InvalidTokenError as e:
+        logging.info(f"Rejected token without calling the server: {e}")
+        forget_user(token)
+        return None
+    ttl = float(getenv("USER_CACHE_TTL"))
+    if isinstance(claims.get("exp"), (int, float)):
+        ttl = min(ttl, claims["exp"] - time.time())
+
+    def load():
+        response = auth_request(
+            "GET",
+            "auth.get_user",
+            f"{getenv('AGIXT_URI')}/v1/user",
+            headers={"Authorization": token},
+        )
+        if response.status_code != 200:
+            raise Unauthorized(response.status_code)
+        return response.json()
+
+    try:
+        user = user_cache.get((transport.token_hash(token), "get_user"), load, ttl)
+    except Unauthorized as e:
+        logging.info(f"The server rejected the token with status {e}.")
+        forget_user(token)
+        return None
+    except RequestException as e:
+        st.error(f"Unable to reach {getenv('APP_NAME')} right now. {e}")
+        st.stop()
+    user["token"] = token
+    return user
+
+
+def user_key(user: dict):
+    # Identifies the user the same way across logins, unlike the token, which changes
+    # on every login: a hash of their id, or of their email where the server has none.
+    identity = user.get("id") or user.get("email")
+    if not identity:
+        return None
+    return hashlib.sha256(str(identity).strip().lower().encode("utf-8")).hexdigest()
+
+
 def sso_buttons():
     code = st.query_params.get("code", "")
     if isinstance(code, list):
@@ -33,40 +133,25 @@ def sso_buttons():
         code = str(code)
     if code == "None" or code is None:
         code = ""
+    sso_providers = get_sso_providers()
+    if not sso_providers or code != "" or "token" in st.query_params:
+        return
     with st.form("sso_form"):
-        for page in os.listdir("./pages"):
-            if page.endswith(".py"):
-                provider = page.split(".py")[0].lower()
-                client_id = getenv(f"{provider.upper()}_CLIENT_ID")
-                if client_id == "":
-                    continue
-                provider_info = get_provider_info(provider=provider)
-                if code == "" and "token" not in st.query_params:
-                    magic_link_uri = getenv("APP_URI")
-                    if magic_link_uri.endswith("/"):
-                        magic_link_uri = magic_link_uri[:-1]
-                    magic_link_uri = f"{magic_link_uri}/{provider}"
-                    magic_link_uri_encoded = urllib.parse.quote(magic_link_uri)
-                    client_id_encoded = urllib.parse.quote(client_id)
-                    sso_uri = ""
-                    scopes = provider_info["scopes"]
-                    scopes = urllib.parse.quote(" ".join(scopes))
-                    sso_uri = f"{provider_info['authorization_url']}?client_id={client_id_encoded}&redirect_uri={magic_link_uri_encoded}&scope={scopes}&response_type=code&access_type=offline&prompt=consent"
-                    if sso_uri != "":
-                        col1, col2 = st.columns([1, 5])
-                        with col1:
-                            icon = provider_info["icon"]
-                            if icon:
-                                st.image(icon, width=40)
-                        with col2:
-                            if st.form_submit_button(
-                                f"Continue with {provider.capitalize()}"
-                            ):
-                                st.markdown(
-                                    f'<meta http-equiv="refresh" content="0;URL={sso_uri}">',
-                                    unsafe_allow_html=True,
-                                )
-                                st.stop()
+        for provider in sso_providers:
+            col1, col2 = st.columns([1, 5])
+            with col1:
+                if provider.icon:
+                    st.markdown(
+                        f'<img src="{asset_url(f"icon-{provider.name}")}" width="40">',
+                        unsafe_allow_html=True,
+                    )
+            with col2:
+                if st.form_submit_button(provider.label):
+                    st.markdown(
+                        f'<meta http-equiv="refresh" content="0;URL={provider.sso_uri}">',
+                        unsafe_allow_html=True,
+                    )
+                    st.stop()
 
 
 def get_user():
@@ -79,12 +164,20 @@ def get_user():
             and st.query_params["code"] != "None"
         ):
             st.session_state["code"] = st.query_params["code"]
+            # Every provider redirects back to the app root and names itself in `state`.
+            st.session_state["sso_provider"] = st.query_params.get("state", "google")
     if "code" in st.session_state:
         code = st.session_state["code"]
         if code != "" and code is not None and code != "None":
-            response = requests.post(
-                f"{auth_uri}/v1/oauth2/google",
-                json={"code": code, "referrer": getenv("APP_URI")},
+            provider = st.session_state.get("sso_provider", "google")
+            if get_provider_info(provider) is None:
+                st.error(f"Unknown sign-in provider: {provider}")
+                st.stop()
+            response = auth_request(
+                "POST",
+                "auth.oauth2",
+                f"{auth_uri}/v1/oauth2/{provider}",
+                json={"code": code, "referrer": get_redirect_uri()},
             )
             if response.status_code == 200:
                 data = response.json()
@@ -117,13 +210,8 @@ def get_user():
         st.session_state["token"] = get_cookie("token")
     token = st.session_state["token"] if "token" in st.session_state else ""
     if token != "" and token is not None and token != "None":
-        user_request = requests.get(
-            f"{auth_uri}/v1/user",
-            headers={"Authorization": token},
-        )
-        if user_request.status_code == 200:
-            user = user_request.json()
-            user["token"] = token
+        user = get_user_profile(token)
+        if user:
             return user
         else:
             set_cookie("token", "", 1)
@@ -137,6 +225,11 @@ def get_user():
         st.markdown(hide_sidebar_style, unsafe_allow_html=True)
         otp_uri = st.session_state["otp_uri"]
         mfa_token = str(otp_uri).split("secret=")[1].split("&")[0]
+        # QR and TOTP support is only needed after registration, so keep it off the
+        # import path of every page.
+        import pyotp
+        import qrcode
+
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -161,7 +254,9 @@ def get_user():
             if confirm_button:
                 otp = pyotp.TOTP(mfa_token).verify(mfa_confirm)
                 if otp:
-                    response = requests.post(
+                    response = auth_request(
+                        "POST",
+                        "auth.login",
                         f"{auth_uri}/v1/login",
                         json={
                             "email": st.session_state["email"],
@@ -201,7 +296,9 @@ def get_user():
                 otp = st.text_input("MFA Token")
                 login_button = st.form_submit_button("Login")
                 if login_button:
-                    auth_response = requests.post(
+                    auth_response = auth_request(
+                        "POST",
+                        "auth.login",
                         f"{auth_uri}/v1/login",
                         json={
                             "email": email,
@@ -237,7 +334,9 @@ def get_user():
                     if email == "" or first_name == "" or last_name == "":
                         st.write("Please fill out all fields.")
                         st.stop()
-                    response = requests.post(
+                    response = auth_request(
+                        "POST",
+                        "auth.register",
                         f"{auth_uri}/v1/user",
                         json={
                             "email": email,
@@ -260,6 +359,7 @@ def log_out_button():
     token = get_cookie("token", "logout_token")
     if token != "":
         if st.button("Log Out"):
+            forget_user(token)
             set_cookie("token", "", 1, "logout_set_token")
             st.query_params.clear()
             st.session_state["token"] = ""
@@ -270,119 +370,3 @@ def log_out_button():
             )
             time.sleep(2)
             st.stop()
-
-
-def sso_redirect(provider: str):
-    auth_uri = getenv("AGIXT_URI")
-    if "code" in st.query_params:
-        if (
-            st.query_params["code"] != ""
-            and st.query_params["code"] is not None
-            and st.query_params["code"] != "None"
-        ):
-            st.session_state["code"] = st.query_params["code"]
-    if "code" in st.session_state:
-        code = st.session_state["code"]
-        if code != "" and code is not None and code != "None":
-            referrer = f"{getenv('APP_URI')}/{provider}"
-            response = requests.post(
-                f"{auth_uri}/v1/oauth2/{provider}",
-                json={"code": code, "referrer": referrer},
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if "detail" in data:
-                    new_uri = data["detail"]
-                    st.markdown(
-                        f'<meta http-equiv="refresh" content="0;URL={new_uri}">',
-                        unsafe_allow_html=True,
-                    )
-                    st.stop()
-                else:
-                    st.error(data)
-                    st.stop()
-    if "token" in st.query_params:
-        if (
-            st.query_params["token"] != ""
-            and st.query_params["token"] is not None
-            and st.query_params["token"] != "None"
-        ):
-            get_user()
-    if "token" not in st.query_params and "code" not in st.query_params:
-        # Reload to ../ page
-        st.markdown(
-            f'<meta http-equiv="refresh" content="1;URL=../">',
-            unsafe_allow_html=True,
-        )
-
-
-def hide_pages():
-    dont_show_pages = [
-        "amazon",
-        "aol",
-        "apple",
-        "autodesk",
-        "battlenet",
-        "bitbucket",
-        "bitly",
-        "clearscore",
-        "cloud_foundry",
-        "deutsche_telekom",
-        "deviantart",
-        "discord",
-        "dropbox",
-        "facebook",
-        "fatsecret",
-        "fitbit",
-        "formstack",
-        "foursquare",
-        "github",
-        "gitlab",
-        "google",
-        "huddle",
-        "imgur",
-        "instagram",
-        "intel_cloud_services",
-        "jive",
-        "keycloak",
-        "linkedin",
-        "microsoft",
-        "netiq",
-        "okta",
-        "openam",
-        "openstreetmap",
-        "orcid",
-        "paypal",
-        "ping_identity",
-        "pixiv",
-        "reddit",
-        "salesforce",
-        "sina_weibo",
-        "spotify",
-        "stack_exchange",
-        "strava",
-        "stripe",
-        "twitch",
-        "viadeo",
-        "vimeo",
-        "vk",
-        "wechat",
-        "withings",
-        "xero",
-        "xing",
-        "yahoo",
-        "yammer",
-        "yandex",
-        "yelp",
-        "zendesk",
-    ]
-    hide_pages_style = """
-    <style>
-    """
-    for page in dont_show_pages:
-        hide_pages_style += f'[data-testid="stSidebar"] ul li:has(a[href*="{page}"]) {{display: none;}}\n'
-    hide_pages_style += """
-    </style>
-    """
-    # Apply the custom CSS
-    st.markdown(hide_pages_style, unsafe_allow_html=True)
@@ -0,0 +1,116 @@
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import sys
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, "static")
+MANIFEST = os.path.join(STATIC_DIR, "manifest.json")
+
+ASSETS = {
+    "logo-light": "https://josh-xt.github.io/AGiXT/images/AGiXT-gradient-light.svg",
+    "logo-flat": "https://josh-xt.github.io/AGiXT/images/AGiXT-gradient-flat.svg",
+    "badge-sponsor-github": "https://img.shields.io/badge/GitHub-Sponsor%20Josh%20XT-blue?logo=github&style=plastic",
+    "badge-sponsor-paypal": "https://img.shields.io/badge/PayPal-Sponsor%20Josh%20XT-blue.svg?logo=paypal&style=plastic",
+    "badge-sponsor-kofi": "https://img.shields.io/badge/Kofi-Sponsor%20Josh%20XT-blue.svg?logo=kofi&style=plastic",
+    "badge-documentation": "https://img.shields.io/badge/Documentation-AGiXT-blue?logo=github&style=plastic",
+    "badge-github": "https://img.shields.io/badge/GitHub-AGiXT-blue?logo=github&style=plastic",
+    "badge-discord": "https://img.shields.io/discord/1097720481970397356?label=Discord&logo=discord&logoColor=white&style=plastic&color=5865f2",
+    "badge-twitter": "https://img.shields.io/badge/Twitter-Follow_@Josh__XT-blue?logo=twitter&style=plastic",
+}
+
+
+@functools.lru_cache(maxsize=1)
+def get_sources():
+    from OAuth2Providers import get_providers
+
+    sources = dict(ASSETS)
+    for provider, provider_info in get_providers().items():
+        if provider_info["icon"]:
+            sources[f"icon-{provider}"] = provider_info["icon"]
+    return sources
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@functools.lru_cache(maxsize=None)
+def asset_url(name: str):
+    """
+    URL of a vendored asset under Streamlit's static serving, or of its original
+    source when it has not been vendored into `static/`.
+    """
+    entry = load_manifest().get(name)
+    if entry and os.path.isfile(os.path.join(STATIC_DIR, entry["file"])):
+        return f"app/static/{entry['file']}"
+    return get_sources()[name]
+
+
+def vendor(timeout: float = 30):
+    # Downloads every source into static/ under a content-hashed name, keeping the
+    # previous copy of any asset that cannot be fetched.
+    previous = load_manifest()
+    manifest = {}
+    for name, source in get_sources().items():
+        try:
+            request = urllib.request.Request(
+                source, headers={"User-Agent": "AGiXT-Streamlit"}
+            )
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                data = response.read()
+                content_type = response.headers.get_content_type()
+        except OSError as e:
+            logging.warning(f"Unable to fetch {name} from {source}: {e}")
+            if name in previous:
+                manifest[name] = previous[name]
+            continue
+        extension = os.path.splitext(urllib.parse.urlparse(source).path)[1]
+        if content_type == "image/svg+xml":
+            extension = ".svg"
+        elif not extension:
+            extension = mimetypes.guess_extension(content_type) or ""
+        file = f"{name}.{hashlib.sha256(data).hexdigest()[:12]}{extension}"
+        path = os.path.join(STATIC_DIR, file)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        manifest[name] = {"file": file, "source": source}
+    kept = {entry["file"] for entry in manifest.values()}
+    for file in os.listdir(STATIC_DIR):
+        if file != os.path.basename(MANIFEST) and file not in kept:
+            os.remove(os.path.join(STATIC_DIR, file))
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Vendor logos, badges and provider icons into static/."
+    )
+    parser.add_argument(
+        "--allow-missing",
+        action="store_true",
+        help="Exit successfully even if some assets are left on their original hosts.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    manifest = vendor()
+    missing = sorted(set(get_sources()) - set(manifest))
+    logging.info(f"Vendored {len(manifest)} of {len(get_sources())} assets.")
+    if missing:
+        # An image built without them would still load these from third-party hosts.
+        logging.error(f"Not vendored: {', '.join(missing)}")
+        sys.exit(0 if args.allow_missing else 1)
@@ -0,0 +1,140 @@
+import contextvars
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    def __init__(self, value, ttl: float):
+        self.value = value
+        self.expires = time.monotonic() + ttl
+
+
+class TTLCache:
+    """
+    Read-through cache with stale-while-revalidate.
+
+    Keys are tuples that start with the user scope and the method name, so
+    `invalidate` can drop every entry of a method for one user. Fresh entries are
+    returned as is; entries less than `stale_ttl` seconds past expiry are returned
+    while a background thread reloads them. Loads that started before an
+    invalidation of their scope are not stored. If a load fails, any older value
+    for the key is served instead, unless the error is one of `fatal`, which means
+    the older value must not be used either.
+    """
+
+    def __init__(self, max_entries: int, stale_ttl: float, fatal: tuple = ()):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.fatal = fatal
+        self.entries = OrderedDict()
+        self.refreshing = set()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple, loader, ttl: float):
+        if ttl <= 0:
+            return loader()
+        now = time.monotonic()
+        with self.lock:
+            generation = self.generations.get(key[0], 0)
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                if now < entry.expires:
+                    return copy.deepcopy(entry.value)
+                if now < entry.expires + self.stale_ttl:
+                    if key not in self.refreshing:
+                        self.refreshing.add(key)
+                        threading.Thread(
+                            target=contextvars.copy_context().run,
+                            args=(self._refresh, key, loader, ttl, generation),
+                            daemon=True,
+                        ).start()
+                    return copy.deepcopy(entry.value)
+        try:
+            value = loader()
+        except Exception as e:
+            # Serve the last known value, however old, rather than failing the page.
+            if entry is None or isinstance(e, self.fatal):
+                raise
+            logging.warning(f"Serving expired {key[1]} after refresh failed: {e}")
+            return copy.deepcopy(entry.value)
+        self.set(key, value, ttl, generation)
+        return copy.deepcopy(value)
+
+    def set(self, key: tuple, value, ttl: float, generation: int = None):
+        with self.lock:
+            if generation is not None and generation != self.generations.get(key[0], 0):
+                return
+            self.entries[key] = CacheEntry(value=value, ttl=ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, scope: str, names):
+        with self.lock:
+            self.generations[scope] = self.generations.get(scope, 0) + 1
+            for key in list(self.entries):
+                if key[0] == scope and key[1] in names:
+                    del self.entries[key]
+
+    def _refresh(self, key, loader, ttl, generation):
+        try:
+            self.set(key, loader(), ttl, generation)
+        except Exception as e:
+            logging.warning(f"Unable to refresh cached {key[1]}: {e}")
+            if isinstance(e, self.fatal):
+                with self.lock:
+                    self.entries.pop(key, None)
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+
+class InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is running,
+    later callers with the same key wait for its result instead of repeating it.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = InFlight()
+                self.calls[key] = call
+                self.requests += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
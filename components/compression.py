@@ -0,0 +1,150 @@
+import logging
+import threading
+import zlib
+from Globals import getenv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content codings this client can send, most preferred first.
+CODINGS = ["zstd", "gzip"] if zstandard else ["gzip"]
+# AGiXT answers a body it cannot read with one of these. 415 is the standard reply to
+# an unsupported Content-Encoding; a backend that ignores the header fails to parse
+# the JSON instead.
+REFUSED_STATUSES = {400, 415, 422}
+
+
+def compressor(coding: str):
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return zlib.compressobj(6, zlib.DEFLATED, 31)
+
+
+def decompressor(coding: str):
+    if coding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(31)
+
+
+def compress(chunks, coding: str):
+    """
+    Compresses an iterable of byte chunks with a content coding, chunk by chunk.
+    """
+    encoder = compressor(coding)
+    for chunk in chunks:
+        if data := encoder.compress(chunk):
+            yield data
+    yield encoder.flush()
+
+
+def decompress(body, coding: str, block_size: int = 1 << 20):
+    """
+    Decodes a compressed body, as bytes or a binary file object, chunk by chunk.
+    """
+    if isinstance(body, (bytes, bytearray)):
+        blocks = [bytes(body)]
+    else:
+        body.seek(0)
+        blocks = iter(lambda: body.read(block_size), b"")
+    decoder = decompressor(coding)
+    for block in blocks:
+        if data := decoder.decompress(block):
+            yield data
+    if hasattr(decoder, "flush") and (data := decoder.flush()):
+        yield data
+
+
+def parse_accept_encoding(header: str) -> set:
+    # "gzip, zstd;q=0.5, br;q=0" lists the codings a server accepts in requests.
+    accepted = set()
+    for item in header.split(","):
+        coding, *parameters = [part.strip() for part in item.split(";")]
+        weight = next(
+            (p.split("=", 1)[1] for p in parameters if p.startswith("q=")), "1"
+        )
+        try:
+            if coding and float(weight) > 0:
+                accepted.add(coding.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+class Negotiation:
+    """
+    The content codings each AGiXT backend accepts in request bodies, as learned from
+    its responses.
+
+    Until a backend says otherwise, bodies are sent with the `TRAINING_COMPRESSION`
+    coding. A backend lists the codings it accepts in an `Accept-Encoding` response
+    header (RFC 7694), and a compressed body it takes confirms that coding. A backend
+    that refuses a compressed body gets it uncompressed, and is sent uncompressed
+    bodies from then on.
+    """
+
+    def __init__(self, setting: str):
+        self.preferred = self.resolve(setting.strip().lower())
+        self.accepted = {}
+        self.warned = set()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def resolve(setting: str):
+        if setting in ("", "none", "off", "false", "identity"):
+            return None
+        if setting == "auto":
+            return CODINGS[0]
+        if setting in CODINGS:
+            return setting
+        if setting == "zstd":
+            logging.warning(
+                "TRAINING_COMPRESSION is zstd but the zstandard package is not "
+                "installed; training uploads are compressed with gzip instead."
+            )
+            return "gzip"
+        logging.warning(
+            f"Unknown TRAINING_COMPRESSION '{setting}'; training uploads are not "
+            "compressed."
+        )
+        return None
+
+    def coding(self, backend: str):
+        # The coding to compress the next body for this backend with, or None.
+        if self.preferred is None:
+            return None
+        with self.lock:
+            accepted = self.accepted.get(backend)
+        if accepted is None or self.preferred in accepted:
+            return self.preferred
+        return next((coding for coding in CODINGS if coding in accepted), None)
+
+    def accepts(self, backend: str, coding: str) -> bool:
+        # Whether the backend is known to take bodies with this coding.
+        with self.lock:
+            return coding in self.accepted.get(backend, set())
+
+    def confirmed(self, backend: str, coding: str):
+        with self.lock:
+            self.accepted[backend] = self.accepted.get(backend, set()) | {coding}
+
+    def advertised(self, backend: str, header):
+        if header is not None:
+            with self.lock:
+                self.accepted[backend] = parse_accept_encoding(header)
+
+    def refused(self, backend: str, coding: str):
+        with self.lock:
+            self.accepted[backend] = self.accepted.get(backend, set()) - {coding}
+            # Bodies sent at once all come back refused; warn about the first.
+            if (backend, coding) in self.warned:
+                return
+            self.warned.add((backend, coding))
+        logging.warning(
+            f"AGiXT at {backend} refused a {coding} request body; training uploads "
+            f"are sent with {self.coding(backend) or 'no compression'} from now on."
+        )
+
+
+negotiation = Negotiation(getenv("TRAINING_COMPRESSION"))
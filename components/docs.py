@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
+from components.assets import asset_url
 
 load_dotenv()
 HIDE_DOCS = os.getenv("HIDE_DOCS", False)
@@ -10,11 +11,11 @@ def agixt_docs():
     if HIDE_DOCS:
         return
     st.markdown(
-        "[![GitHub](https://img.shields.io/badge/GitHub-Sponsor%20Josh%20XT-blue?logo=github&style=plastic)](https://github.com/sponsors/Josh-XT) [![PayPal](https://img.shields.io/badge/PayPal-Sponsor%20Josh%20XT-blue.svg?logo=paypal&style=plastic)](https://paypal.me/joshxt) [![Ko-Fi](https://img.shields.io/badge/Kofi-Sponsor%20Josh%20XT-blue.svg?logo=kofi&style=plastic)](https://ko-fi.com/joshxt)"
+        f"[![GitHub]({asset_url('badge-sponsor-github')})](https://github.com/sponsors/Josh-XT) [![PayPal]({asset_url('badge-sponsor-paypal')})](https://paypal.me/joshxt) [![Ko-Fi]({asset_url('badge-sponsor-kofi')})](https://ko-fi.com/joshxt)"
     )
 
     st.markdown(
-        "[![Documentation](https://img.shields.io/badge/Documentation-AGiXT-blue?logo=github&style=plastic)](https://josh-xt.github.io/AGiXT/) [![GitHub](https://img.shields.io/badge/GitHub-AGiXT-blue?logo=github&style=plastic)](https://github.com/Josh-XT/AGiXT) [![Discord](https://img.shields.io/discord/1097720481970397356?label=Discord&logo=discord&logoColor=white&style=plastic&color=5865f2)](https://discord.gg/d3TkHRZcjD) [![Twitter](https://img.shields.io/badge/Twitter-Follow_@Josh__XT-blue?logo=twitter&style=plastic)](https://twitter.com/Josh_XT)"
+        f"[![Documentation]({asset_url('badge-documentation')})](https://josh-xt.github.io/AGiXT/) [![GitHub]({asset_url('badge-github')})](https://github.com/Josh-XT/AGiXT) [![Discord]({asset_url('badge-discord')})](https://discord.gg/d3TkHRZcjD) [![Twitter]({asset_url('badge-twitter')})](https://twitter.com/Josh_XT)"
     )
 
 
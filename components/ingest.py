@@ -0,0 +1,325 @@
+import base64
+import codecs
+import contextvars
+import json
+import logging
+import os
+import selectors
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from components.compression import compress, negotiation
+from Globals import getenv
+
+# Sent as text when text extraction is on, which skips base64 altogether.
+TEXT_EXTENSIONS = {".txt", ".md", ".csv"}
+
+
+def file_body(file, file_name: str, collection_number, block_size: int):
+    """
+    The JSON body of AGiXT's `learn/file` endpoint for a binary file object, in
+    chunks, with the file base64 encoded `block_size` bytes at a time.
+    """
+    block_size = block_size // 4 * 3 or 3
+    fields = json.dumps(
+        {"file_name": file_name, "collection_number": str(collection_number)}
+    )
+    yield f'{fields[:-1]}, "file_content": "'.encode("utf-8")
+    file.seek(0)
+    while block := file.read(block_size):
+        yield base64.b64encode(block)
+    yield b'"}'
+
+
+def text_body(file, file_name: str, collection_number, block_size: int):
+    """
+    The JSON body of AGiXT's `learn/text` endpoint for a UTF-8 text file, in chunks.
+    """
+    fields = json.dumps(
+        {"user_input": file_name, "collection_number": str(collection_number)}
+    )
+    yield f'{fields[:-1]}, "text": "'.encode("utf-8")
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    file.seek(0)
+    while True:
+        block = file.read(block_size)
+        text = decoder.decode(block, final=not block)
+        if text:
+            yield json.dumps(text)[1:-1].encode("utf-8")
+        if not block:
+            break
+    yield b'"}'
+
+
+def prepare(
+    path: str,
+    file_name: str,
+    collection_number,
+    extract_text: bool,
+    coding,
+    body_path: str,
+) -> str:
+    # Runs in a worker process: encodes a spooled file into the request body AGiXT
+    # expects, compressed with `coding` if given, at `body_path`, and returns the
+    # endpoint to send it to.
+    extension = os.path.splitext(file_name)[1].lower()
+    source = "text" if extract_text and extension in TEXT_EXTENSIONS else "file"
+    encode = text_body if source == "text" else file_body
+    try:
+        with open(path, "rb") as file, open(body_path, "wb") as body:
+            chunks = encode(
+                file, file_name, collection_number, int(getenv("UPLOAD_CHUNK_SIZE"))
+            )
+            for chunk in compress(chunks, coding) if coding else chunks:
+                body.write(chunk)
+    except BaseException:
+        remove(body_path)
+        raise
+    return source
+
+
+def remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def serve():
+    # Entry point of a worker process: prepares one file per line of stdin and
+    # answers on stdout. Anything else the process prints goes to stderr instead.
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    for line in sys.stdin:
+        try:
+            reply = {"source": prepare(**json.loads(line))}
+        except Exception as e:
+            reply = {"error": str(e) or type(e).__name__}
+        replies.write(json.dumps(reply) + "\n")
+        replies.flush()
+
+
+class WorkerPool:
+    """
+    Worker processes that encode spooled files into request bodies, off the Streamlit
+    server's GIL. Each runs `python -m components.ingest` and takes one file at a time
+    over a pipe, so it never imports a page, which `multiprocessing` would re-run as
+    the main module of a spawned worker.
+
+    Workers start on first use and are reused. A worker that dies, for example when
+    it is killed for running out of memory on a large file, or that takes longer than
+    `timeout` seconds, only fails the file it was encoding and is replaced on the
+    next one.
+    """
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="agixt-ingest-worker"
+        )
+
+    def spawn(self) -> subprocess.Popen:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        path = os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))
+        return subprocess.Popen(
+            [sys.executable, "-m", "components.ingest"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=dict(os.environ, PYTHONPATH=path),
+        )
+
+    def start(self):
+        # Starts every worker ahead of the first batch.
+        with self.lock:
+            while len(self.idle) < self.workers:
+                self.idle.append(self.spawn())
+
+    def run(self, job: dict) -> str:
+        worker = None
+        with self.lock:
+            # Idle workers that have died since their last file are skipped.
+            while self.idle and worker is None:
+                candidate = self.idle.pop()
+                if candidate.poll() is None:
+                    worker = candidate
+        worker = worker or self.spawn()
+        line = ""
+        timed_out = False
+        try:
+            worker.stdin.write(json.dumps(job) + "\n")
+            worker.stdin.flush()
+            # Each job is answered with one line, so nothing is buffered before it.
+            with selectors.DefaultSelector() as selector:
+                selector.register(worker.stdout, selectors.EVENT_READ)
+                if selector.select(self.timeout):
+                    line = worker.stdout.readline()
+                else:
+                    timed_out = True
+        except OSError:
+            pass
+        if not line:
+            worker.kill()
+            worker.wait()
+            remove(job["body_path"])
+            if timed_out:
+                logging.warning(
+                    f"Ingest worker did not encode {job['file_name']} within "
+                    f"{self.timeout:g} seconds and was replaced."
+                )
+                raise RuntimeError(
+                    f"Encoding this file took longer than {self.timeout:g} seconds."
+                )
+            logging.warning(
+                f"Ingest worker stopped with exit code {worker.returncode} while "
+                f"encoding {job['file_name']}."
+            )
+            raise RuntimeError("The worker encoding this file stopped unexpectedly.")
+        with self.lock:
+            self.idle.append(worker)
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["source"]
+
+    def submit(self, **job) -> Future:
+        return self.executor.submit(self.run, job)
+
+
+def discard(prepared, body_path: str):
+    # Drops a prepared body that will not be sent, once it has been written.
+    if not prepared.cancel():
+        prepared.add_done_callback(lambda _: remove(body_path))
+
+
+def ingest_files(
+    ApiClient,
+    agent_name: str,
+    files: list,
+    collection_number,
+    extract_text=False,
+    learned=None,
+):
+    """
+    Learns spooled files in two overlapping stages: bodies are encoded by the
+    `INGEST_PROCESSES` worker processes, and sent to AGiXT with at most
+    `TRAINING_CONCURRENCY` in flight. As many again are encoded ahead of the sends,
+    and the next file is only started as one finishes. Bodies are compressed when
+    `TRAINING_COMPRESSION` is set and AGiXT accepts it. `files` holds
+    `(file_name, path)` pairs. Yields `(index, error, body_bytes, seconds)` as each
+    file finishes, where `index` is the file's position in `files`, `body_bytes` the
+    size of the body sent and `error` None on success.
+
+    `learned(index)` is called from the sending thread as soon as AGiXT has taken a
+    file, so files whose send was already under way when the batch is stopped are
+    still accounted for.
+    """
+
+    def send(index: int, prepared, body_path: str, coding):
+        start = time.perf_counter()
+        try:
+            source = prepared.result()
+        except Exception as e:
+            return str(e), 0, time.perf_counter() - start
+        try:
+            size = os.path.getsize(body_path)
+            with open(body_path, "rb") as body:
+                ApiClient.learn_body(
+                    agent_name=agent_name, source=source, body=body, coding=coding
+                )
+        except Exception as e:
+            return str(e), 0, time.perf_counter() - start
+        finally:
+            remove(body_path)
+        if learned:
+            try:
+                learned(index)
+            except Exception as e:
+                logging.warning(f"Unable to record {files[index][0]} as learned: {e}")
+        return None, size, time.perf_counter() - start
+
+    concurrency = int(getenv("TRAINING_CONCURRENCY"))
+    senders = ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="agixt-ingest"
+    )
+    coding = negotiation.coding(ApiClient.base_uri)
+    queued = iter(enumerate(files))
+    pending = {}
+
+    def start_next():
+        # Starts encoding and sending the next file, if any are left.
+        item = next(queued, None)
+        if item is None:
+            return
+        index, (file_name, path) = item
+        body_path = os.path.join(
+            os.path.dirname(path),
+            f".{os.path.basename(path)}.{uuid.uuid4().hex}.body",
+        )
+        prepared = workers.submit(
+            path=path,
+            file_name=file_name,
+            collection_number=str(collection_number),
+            extract_text=extract_text,
+            coding=coding,
+            body_path=body_path,
+        )
+        future = senders.submit(
+            contextvars.copy_context().run, send, index, prepared, body_path, coding
+        )
+        pending[future] = (index, prepared, body_path)
+
+    try:
+        # Encoded bodies wait on disk until sent, so only a window of files is
+        # started at a time.
+        for _ in range(2 * concurrency):
+            start_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)[0]
+                start_next()
+                yield (index, *future.result())
+    finally:
+        # A rerun or a closed tab stops the batch; files not yet sent are dropped.
+        for future, (_, prepared, body_path) in pending.items():
+            if future.cancel():
+                discard(prepared, body_path)
+        senders.shutdown(wait=False)
+
+
+def learn_text(
+    ApiClient, agent_name: str, user_input: str, text: str, collection_number
+):
+    """
+    Sends text to AGiXT's `learn/text` endpoint, compressed when `TRAINING_COMPRESSION`
+    is set and AGiXT accepts it.
+    """
+    body = json.dumps(
+        {
+            "user_input": user_input,
+            "text": text,
+            "collection_number": str(collection_number),
+        }
+    ).encode("utf-8")
+    coding = negotiation.coding(ApiClient.base_uri)
+    if coding:
+        body = b"".join(compress([body], coding))
+    return ApiClient.learn_body(
+        agent_name=agent_name, source="text", body=body, coding=coding
+    )
+
+
+workers = WorkerPool(
+    int(getenv("INGEST_PROCESSES")) or os.cpu_count(),
+    timeout=float(getenv("INGEST_TIMEOUT")),
+)
+
+if __name__ == "__main__":
+    serve()
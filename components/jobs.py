@@ -0,0 +1,160 @@
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from components.metrics import metrics
+from Globals import getenv
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created);
+"""
+
+
+class JobQueue:
+    """
+    Background jobs on a bounded worker pool, with their status and results kept in
+    SQLite so they survive reruns, page changes and reconnects.
+
+    Jobs belong to an owner, a stable key of the user that outlives their login
+    token, and are only listed and cancelled by that owner. A queued job that is
+    cancelled never starts. AGiXT cannot abort a run it has started, so cancelling a
+    running job only discards its result. Jobs that were queued or running when the
+    process stopped are marked interrupted on start.
+    """
+
+    def __init__(self, path: str, workers: int, keep: int = 50):
+        self.path = path
+        self.keep = keep
+        self.cancelled = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="agixt-job"
+        )
+        self.counts = {"submitted": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as db:
+            db.executescript(SCHEMA)
+            db.execute(
+                "UPDATE jobs SET status = 'interrupted', error = ?, finished = ? "
+                "WHERE status IN ('queued', 'running')",
+                ("The app restarted before the job finished.", time.time()),
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self.connect() as db:
+            db.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id)
+            )
+
+    def submit(self, owner: str, title: str, fn, *args, **kwargs) -> str:
+        job_id = uuid.uuid4().hex
+        with self.connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, owner, title, status, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, owner, title, "queued", time.time()),
+            )
+            # Only the most recent jobs of each owner are kept.
+            db.execute(
+                "DELETE FROM jobs WHERE owner = ? AND status NOT IN ('queued', 'running') "
+                "AND id NOT IN (SELECT id FROM jobs WHERE owner = ? "
+                "ORDER BY created DESC LIMIT ?)",
+                (owner, owner, self.keep),
+            )
+        with self.lock:
+            self.counts["submitted"] += 1
+        self.executor.submit(
+            contextvars.copy_context().run, self.run, job_id, fn, args, kwargs
+        )
+        return job_id
+
+    def run(self, job_id: str, fn, args: tuple, kwargs: dict):
+        with self.lock:
+            if job_id in self.cancelled:
+                self.cancelled.discard(job_id)
+                return
+            self.update(job_id, status="running", started=time.time())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            logging.warning(f"Job {job_id} failed: {e}")
+            status, fields = "failed", {"error": str(e)}
+        else:
+            status, fields = "succeeded", {"result": json.dumps(result, default=str)}
+        with self.lock:
+            if job_id in self.cancelled:
+                self.cancelled.discard(job_id)
+                return
+            self.counts[status] += 1
+            self.update(job_id, status=status, finished=time.time(), **fields)
+
+    def cancel(self, owner: str, job_id: str) -> bool:
+        with self.lock:
+            with self.connect() as db:
+                updated = db.execute(
+                    "UPDATE jobs SET status = 'cancelled', finished = ? "
+                    "WHERE id = ? AND owner = ? AND status IN ('queued', 'running')",
+                    (time.time(), job_id, owner),
+                ).rowcount
+            if updated:
+                self.cancelled.add(job_id)
+                self.counts["cancelled"] += 1
+        return bool(updated)
+
+    def jobs(self, owner: str, limit: int = 20) -> list:
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT * FROM jobs WHERE owner = ? ORDER BY created DESC LIMIT ?",
+                (owner, limit),
+            ).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job["result"] = json.loads(job["result"]) if job["result"] else None
+            jobs.append(job)
+        return jobs
+
+    def active(self, owner: str) -> int:
+        with self.connect() as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE owner = ? AND status IN ('queued', 'running')",
+                (owner,),
+            ).fetchone()[0]
+
+
+queue = JobQueue(path=getenv("JOBS_DB"), workers=int(getenv("JOB_WORKERS")))
+for status in queue.counts:
+    metrics.register_counter(
+        f"agixt_jobs_{status}_total",
+        f"Background jobs {status}",
+        lambda status=status: queue.counts[status],
+    )
@@ -0,0 +1,130 @@
+import bisect
+import contextvars
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+current_page = contextvars.ContextVar("current_page", default="unknown")
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    Call counts, error counts and latency histograms for frontend-to-AGiXT
+    traffic, labelled by page and method, rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.errors = {}
+        self.buckets = {}
+        self.sums = {}
+        self.counters = []
+        self.lock = threading.Lock()
+
+    def observe(self, method: str, seconds: float, error: bool = False):
+        labels = (current_page.get(), method)
+        with self.lock:
+            self.calls[labels] = self.calls.get(labels, 0) + 1
+            if error:
+                self.errors[labels] = self.errors.get(labels, 0) + 1
+            if labels not in self.buckets:
+                self.buckets[labels] = [0] * (len(BUCKETS) + 1)
+            self.buckets[labels][bisect.bisect_left(BUCKETS, seconds)] += 1
+            self.sums[labels] = self.sums.get(labels, 0.0) + seconds
+
+    def register_counter(self, name: str, help_text: str, read):
+        self.counters.append((name, help_text, read))
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for name, help_text, values in [
+                ("agixt_calls_total", "AGiXT calls made", self.calls),
+                ("agixt_call_errors_total", "AGiXT calls that failed", self.errors),
+            ]:
+                lines.append(f"# HELP {name} {help_text}.")
+                lines.append(f"# TYPE {name} counter")
+                for (page, method), value in sorted(values.items()):
+                    lines.append(
+                        f'{name}{{page="{escape(page)}",method="{escape(method)}"}} {value}'
+                    )
+            name = "agixt_call_duration_seconds"
+            lines.append(f"# HELP {name} AGiXT call latency.")
+            lines.append(f"# TYPE {name} histogram")
+            for (page, method), counts in sorted(self.buckets.items()):
+                labels = f'page="{escape(page)}",method="{escape(method)}"'
+                total = 0
+                for bound, count in zip(BUCKETS + ["+Inf"], counts):
+                    total += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+                lines.append(f"{name}_sum{{{labels}}} {self.sums[(page, method)]}")
+                lines.append(f"{name}_count{{{labels}}} {total}")
+        for name, help_text, read in self.counters:
+            lines.append(f"# HELP {name} {help_text}.")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {read()}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def instrument(method: str, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        error = True
+        try:
+            result = fn(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            metrics.observe(method, time.perf_counter() - start, error=error)
+
+    return wrapper
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+server = None
+server_lock = threading.Lock()
+
+
+def start_metrics_server(port: str):
+    global server
+    if not port or port == "0" or server is not None:
+        return
+    with server_lock:
+        if server is not None:
+            return
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", int(port)), MetricsHandler)
+        except OSError as e:
+            logging.warning(f"Unable to start metrics endpoint on port {port}: {e}")
+            server = False
+            return
+        threading.Thread(
+            target=server.serve_forever, name="agixt-metrics", daemon=True
+        ).start()
+        logging.info(f"Serving AGiXT metrics on port {port} at /metrics")
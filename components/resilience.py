@@ -0,0 +1,82 @@
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from requests.exceptions import RequestException
+
+
+class CircuitOpenError(RequestException):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails fast once a backend has failed `threshold` times in a row.
+
+    After `cooldown` seconds a single trial request is let through; its outcome
+    closes the circuit again or restarts the cooldown.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def before(self, name: str):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_running:
+                raise CircuitOpenError(f"{name} is unavailable, try again shortly.")
+            self.trial_running = True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or (
+                self.opened_at is None and self.failures >= self.threshold
+            ):
+                self.opened_at = time.monotonic()
+                self.opened += 1
+            self.trial_running = False
+
+
+class LatencyTracker:
+    """Rolling latency samples per endpoint, used to decide when to hedge."""
+
+    def __init__(self, samples: int = 200, max_endpoints: int = 512):
+        self.samples = samples
+        self.max_endpoints = max_endpoints
+        self.endpoints = OrderedDict()
+        self.lock = threading.Lock()
+
+    def observe(self, endpoint: str, seconds: float):
+        with self.lock:
+            if endpoint not in self.endpoints:
+                self.endpoints[endpoint] = deque(maxlen=self.samples)
+                while len(self.endpoints) > self.max_endpoints:
+                    self.endpoints.popitem(last=False)
+            self.endpoints.move_to_end(endpoint)
+            self.endpoints[endpoint].append(seconds)
+
+    def p95(self, endpoint: str, min_samples: int = 20):
+        with self.lock:
+            samples = sorted(self.endpoints.get(endpoint, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[int(len(samples) * 0.95) - 1]
+
+
+def backoff(attempt: int, base: float = 0.2, cap: float = 5.0) -> float:
+    # Full jitter, so retries from many sessions do not arrive in lockstep.
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -1,12 +1,61 @@
+import functools
 import streamlit as st
 import os
 import logging
 import html
 import re
-import base64
 import json
 from components.docs import predefined_memory_collections
+from components.metrics import metrics
 from agixtsdk import AGiXTSDK
+from Globals import getenv
+
+
+CODE_BLOCK = re.compile(r"```(.*)```", re.DOTALL)
+GENERATED_IMAGE = re.compile(r"#GENERATED_IMAGE:(.*?)(?=\n|$)")
+
+
+@functools.lru_cache(maxsize=int(getenv("RENDER_CACHE_SIZE")))
+def render_message(timestamp, role, message, from_agent):
+    """
+    HTML for one conversation message. Cached by content, so a rerun only renders
+    messages that are new or changed since the last one.
+    """
+    image = GENERATED_IMAGE.search(message)
+    if image:
+        source = image.group(1).strip()
+        if not source.startswith(("http://", "https://", "data:")):
+            source = f"data:image/png;base64,{source}"
+        body = f"<img src='{html.escape(source)}'>"
+    else:
+        body = html.escape(message).replace(r"\n", "<br>")
+        body = CODE_BLOCK.sub(
+            lambda match: f"<pre><code>{match.group(1)}</code></pre>", body
+        )
+    css_class = "agent-message" if from_agent else "user-message"
+    return f"<div class='message {css_class}'>{timestamp}<br><b>{role}:</b><br>{body}</div>"
+
+
+metrics.register_counter(
+    "history_render_cache_hits_total",
+    "Conversation messages served from the render cache",
+    lambda: render_message.cache_info().hits,
+)
+metrics.register_counter(
+    "history_render_cache_misses_total",
+    "Conversation messages rendered to HTML",
+    lambda: render_message.cache_info().misses,
+)
+
+
+def message_key(item):
+    return item.get("id") or (item["timestamp"], item["role"], item["message"])
+
+
+def merge_messages(older, newer):
+    # Both lists are oldest first; `newer` wins where they overlap.
+    keys = {message_key(item) for item in newer}
+    return [item for item in older if message_key(item) not in keys] + newer
 
 
 class AGiXTSelectors:
@@ -26,6 +75,8 @@ class AGiXTSelectors:
     def cached_get_extensions(self):
         return self.sdk.get_extensions()
 
+    # A fragment, so "Load older messages" reruns only the history panel.
+    @st.fragment
     def get_history(self, agent_name, conversation_name):
         message_container_css = """
             <style>
@@ -57,56 +108,107 @@ class AGiXTSelectors:
         """
         st.write(message_container_css, unsafe_allow_html=True)
         with st.container():
-            message_container = "<div class='message-container'>"
             try:
-                history = self.sdk.get_conversation(
-                    agent_name=agent_name,
-                    conversation_name=conversation_name,
-                    limit=100,
-                    page=1,
+                history = self.history_window(
+                    agent_name=agent_name, conversation_name=conversation_name
                 )
-                if isinstance(history, str):
-                    st.write(history)
-                else:
-                    history.reverse()
-                    for item in history:
-                        item["message"] = html.escape(item["message"])
-                        item["message"] = item["message"].replace(r"\n", "<br>")
-                        code_block_match = re.search(
-                            r"```(.*)```", item["message"], re.DOTALL
-                        )
-                        if code_block_match:
-                            code_message = code_block_match.group(1)
-                            item["message"] = re.sub(
-                                r"```.*```",
-                                f"<pre><code>{code_message}</code></pre>",
-                                item["message"],
-                                flags=re.DOTALL,
-                            )
-                        message = f"{item['timestamp']}<br><b>{item['role']}:</b><br>{item['message']}"
-                        if "#GENERATED_IMAGE:" in item["message"]:
-                            image_content = re.search(
-                                r"#(.*?)(?=\n|$)", item["message"]
-                            )
-                            image_content = image_content.replace(
-                                "GENERATED_IMAGE:", ""
-                            )
-                            image_content = base64.b64encode(image_content).decode(
-                                "utf-8"
-                            )
-                            message = f"{item['timestamp']}<br><b>{item['role']}:</b><br><img src='data:image/png;base64,{image_content}'>"
-                        if agent_name in item["role"]:
-                            message_container += (
-                                f"<div class='message agent-message'>{message}</div>"
-                            )
-                        else:
-                            message_container += (
-                                f"<div class='message user-message'>{message}</div>"
-                            )
             except Exception as e:
                 print(e)
-            message_container += "</div>"
-            st.write(message_container, unsafe_allow_html=True)
+                history = []
+            if isinstance(history, str):
+                st.write(history)
+                history = []
+            message_container = "".join(
+                render_message(
+                    item["timestamp"],
+                    item["role"],
+                    item["message"],
+                    agent_name in item["role"],
+                )
+                for item in history
+            )
+            st.write(
+                f"<div class='message-container'>{message_container}</div>",
+                unsafe_allow_html=True,
+            )
+
+    def history_window(self, agent_name, conversation_name):
+        """
+        The most recent messages of a conversation, oldest first, preceded by any older
+        pages the user asked for with "Load older messages".
+
+        The first load fetches the latest page. After that the newest message kept in
+        the session is a cursor, and a rerun only fetches the messages after it.
+        """
+        page_size = int(getenv("HISTORY_PAGE_SIZE"))
+        windows = st.session_state.setdefault("history_windows", {})
+        window = windows.get(conversation_name)
+        newer = None
+        if window and window["messages"]:
+            newer = self.newer_messages(
+                agent_name=agent_name,
+                conversation_name=conversation_name,
+                cursor=message_key(window["messages"][-1]),
+                limit=page_size,
+            )
+            if isinstance(newer, str):
+                return newer
+        if newer is None:
+            # No cursor yet, or it is more than a page behind; start over rather
+            # than show a gap.
+            latest = self.sdk.get_conversation(
+                agent_name=agent_name,
+                conversation_name=conversation_name,
+                limit=page_size,
+                page=1,
+            )
+            if isinstance(latest, str):
+                return latest
+            messages = latest[::-1]
+            complete = len(latest) < page_size
+        else:
+            messages = merge_messages(window["messages"], newer)
+            complete = window["complete"]
+        if not complete and st.button("Load older messages", key="load_older_messages"):
+            older = self.sdk.get_conversation(
+                agent_name=agent_name,
+                conversation_name=conversation_name,
+                limit=page_size,
+                page=len(messages) // page_size + 1,
+            )
+            if isinstance(older, str):
+                st.write(older)
+            else:
+                merged = merge_messages(older[::-1], messages)
+                complete = len(older) < page_size or len(merged) == len(messages)
+                messages = merged
+        windows[conversation_name] = {"messages": messages, "complete": complete}
+        return messages
+
+    def newer_messages(self, agent_name, conversation_name, cursor, limit):
+        # Walks the conversation from its newest message in small pages until it
+        # reaches the cursor, so the payload grows with the new messages rather than
+        # with the history. None when the cursor is not within `limit` messages.
+        sync_size = int(getenv("HISTORY_SYNC_PAGE_SIZE"))
+        newer = []
+        page = 1
+        while len(newer) < limit:
+            batch = self.sdk.get_conversation(
+                agent_name=agent_name,
+                conversation_name=conversation_name,
+                limit=sync_size,
+                page=page,
+            )
+            if isinstance(batch, str):
+                return batch
+            for item in batch:
+                if message_key(item) == cursor:
+                    return newer[::-1]
+                newer.append(item)
+            if len(batch) < sync_size:
+                return None
+            page += 1
+        return None
 
     def build_args(
         self,
@@ -470,6 +572,9 @@ class AGiXTSelectors:
                         agent_name=agent_name,
                         conversation_name=st.session_state["conversation"],
                     )
+                    st.session_state.get("history_windows", {}).pop(
+                        st.session_state["conversation"], None
+                    )
                     with open(os.path.join("conversation.txt"), "w") as f:
                         f.write("")
                     st.success("Conversation history deleted successfully.")
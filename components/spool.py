@@ -0,0 +1,129 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+from Globals import getenv
+
+
+class SpoolFull(Exception):
+    pass
+
+
+class UploadSpool:
+    """
+    Uploaded files on disk, named by the SHA-256 of their content, so the same file
+    uploaded again or kept by the uploader across reruns is stored once.
+
+    Once the spool grows past `max_bytes`, the least recently used files are removed.
+    Files of a batch that is being trained are kept until the batch ends.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, block_size: int = 1 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.batches = []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Yields a set that `put` and `get` add the paths they return to. None of them
+        are evicted until the block exits.
+        """
+        paths = set()
+        with self.lock:
+            self.batches.append(paths)
+        try:
+            yield paths
+        finally:
+            with self.lock:
+                self.batches.remove(paths)
+            if paths:
+                self.evict()
+
+    def check(self, batch):
+        # Fails once a batch no longer fits in the spool.
+        if batch is None:
+            return
+        size = sum(os.path.getsize(held) for held in batch)
+        if size > self.max_bytes:
+            raise SpoolFull(
+                f"These files total {size / 1e6:.1f} MB, more than the "
+                f"{self.max_bytes / 1e6:.1f} MB kept for uploads (UPLOAD_SPOOL_SIZE). "
+                "Train them in smaller batches."
+            )
+
+    def path(self, digest: str, name: str) -> str:
+        return os.path.join(
+            self.directory, f"{digest}{os.path.splitext(name)[1].lower()}"
+        )
+
+    def put(self, file, name: str, batch: set = None):
+        """
+        Stores a binary file object, hashing it while it is copied, and returns its
+        digest and path in the spool. With a `batch`, the file is kept until it ends.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        sha256 = hashlib.sha256()
+        file.seek(0)
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, prefix=".upload-", delete=False
+        ) as spooled:
+            try:
+                while block := file.read(self.block_size):
+                    sha256.update(block)
+                    spooled.write(block)
+            except BaseException:
+                os.remove(spooled.name)
+                raise
+        digest = sha256.hexdigest()
+        path = self.path(digest, name)
+        with self.lock:
+            if os.path.exists(path):
+                os.remove(spooled.name)
+                os.utime(path)
+            else:
+                os.replace(spooled.name, path)
+            if batch is not None:
+                batch.add(path)
+        self.check(batch)
+        self.evict(keep=path)
+        return digest, path
+
+    def get(self, digest: str, name: str, batch: set = None):
+        path = self.path(digest, name)
+        with self.lock:
+            if not os.path.exists(path):
+                return None
+            os.utime(path)
+            if batch is not None:
+                batch.add(path)
+        self.check(batch)
+        return path
+
+    def evict(self, keep: str = None):
+        with self.lock:
+            held = set().union(*self.batches)
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep or path in held:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+spool = UploadSpool(
+    directory=getenv("UPLOAD_SPOOL_DIR"), max_bytes=int(getenv("UPLOAD_SPOOL_SIZE"))
+)
@@ -0,0 +1,155 @@
+import contextlib
+import contextvars
+import os
+import sqlite3
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from components.transport import read_timeout
+from Globals import getenv
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str):
+    """
+    The canonical form of a pasted web address, or None when it is not one. Adds a
+    missing scheme, lowercases the scheme and host, drops default ports and fragments.
+    """
+    url = url.strip()
+    if not url or any(character.isspace() for character in url):
+        return None
+    if "://" not in url:
+        url = f"https://{url}"
+    try:
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname
+    if ":" in netloc:
+        netloc = f"[{netloc}]"
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    if "@" in parts.netloc:
+        netloc = f"{parts.netloc.rsplit('@', 1)[0]}@{netloc}"
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def normalize_urls(text: str):
+    """
+    Splits pasted text into unique normalized URLs, in the order given, and the lines
+    that are not web addresses.
+    """
+    urls = {}
+    invalid = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        url = normalize_url(line)
+        if url is None:
+            invalid.append(line.strip())
+        else:
+            urls.setdefault(url, None)
+    return list(urls), invalid
+
+
+def learn_urls(ApiClient, agent_name: str, urls: list, collection_number="0"):
+    """
+    Sends websites to `learn_url` with at most `TRAINING_CONCURRENCY` in flight, each
+    within `TRAINING_URL_TIMEOUT` seconds. Yields `(url, error, seconds)` as each one
+    finishes, with `error` None on success.
+    """
+
+    def learn(url: str):
+        start = time.perf_counter()
+        try:
+            with read_timeout(float(getenv("TRAINING_URL_TIMEOUT"))):
+                ApiClient.learn_url(
+                    agent_name=agent_name, url=url, collection_number=collection_number
+                )
+        except Exception as e:
+            return str(e), time.perf_counter() - start
+        return None, time.perf_counter() - start
+
+    executor = ThreadPoolExecutor(
+        max_workers=int(getenv("TRAINING_CONCURRENCY")),
+        thread_name_prefix="agixt-training",
+    )
+    try:
+        futures = {
+            executor.submit(contextvars.copy_context().run, learn, url): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            yield (futures[future], *future.result())
+    finally:
+        # A rerun or a closed tab stops the batch; websites not yet sent are dropped.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TrainingLedger:
+    """
+    The files each agent has learned, by user, agent, memory collection and the
+    SHA-256 of the content, so the same file is not embedded into a collection twice.
+    Users are keyed by the client's owner, which stays the same across logins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS learned ("
+                "owner TEXT NOT NULL, agent TEXT NOT NULL, collection TEXT NOT NULL, "
+                "sha256 TEXT NOT NULL, file_name TEXT NOT NULL, learned REAL NOT NULL, "
+                "PRIMARY KEY (owner, agent, collection, sha256))"
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def learned(self, owner: str, agent: str, collection, sha256: str) -> bool:
+        with self.connect() as db:
+            return (
+                db.execute(
+                    "SELECT 1 FROM learned WHERE owner = ? AND agent = ? "
+                    "AND collection = ? AND sha256 = ?",
+                    (owner, agent, str(collection), sha256),
+                ).fetchone()
+                is not None
+            )
+
+    def record(self, owner: str, agent: str, collection, sha256: str, file_name: str):
+        with self.connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO learned VALUES (?, ?, ?, ?, ?, ?)",
+                (owner, agent, str(collection), sha256, file_name, time.time()),
+            )
+
+    def forget(self, owner: str, agent: str, collection=None):
+        # After memories are wiped, their files can be learned again.
+        with self.connect() as db:
+            if collection is None:
+                db.execute(
+                    "DELETE FROM learned WHERE owner = ? AND agent = ?", (owner, agent)
+                )
+            else:
+                db.execute(
+                    "DELETE FROM learned WHERE owner = ? AND agent = ? AND collection = ?",
+                    (owner, agent, str(collection)),
+                )
+
+
+ledger = TrainingLedger(getenv("TRAINING_LEDGER"))
@@ -0,0 +1,292 @@
+import contextlib
+import contextvars
+import hashlib
+import json
+import re
+import threading
+import time
+import requests
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from components.cache import SingleFlight
+from components.metrics import metrics
+from components.resilience import CircuitBreaker, LatencyTracker, backoff
+from Globals import getenv
+
+
+def token_hash(token):
+    token = str(token or "").replace("Bearer ", "").replace("bearer ", "")
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PooledSession:
+    def __init__(self, max_connections: int):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_connections, pool_maxsize=max_connections
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.client = None
+        self.last_used = time.monotonic()
+
+    def close(self):
+        self.session.close()
+
+
+class SessionPool:
+    """
+    Process-wide keep-alive sessions, one per user, keyed by a hash of the user token.
+
+    Least recently used sessions are closed once the pool is full, and sessions
+    idle for longer than `idle_timeout` seconds are closed on the next lookup.
+    """
+
+    def __init__(self, max_size: int, idle_timeout: float, max_connections: int):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, token) -> PooledSession:
+        key = token_hash(token)
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = PooledSession(max_connections=self.max_connections)
+                self.entries[key] = entry
+                while len(self.entries) > self.max_size:
+                    _, evicted = self.entries.popitem(last=False)
+                    evicted.close()
+            else:
+                self.entries.move_to_end(key)
+            entry.last_used = now
+            return entry
+
+    def discard(self, token):
+        with self.lock:
+            entry = self.entries.pop(token_hash(token), None)
+        if entry is not None:
+            entry.close()
+
+    def _evict_idle(self, now):
+        for key in list(self.entries):
+            if now - self.entries[key].last_used <= self.idle_timeout:
+                break
+            self.entries.pop(key).close()
+
+
+pool = SessionPool(
+    max_size=int(getenv("AGIXT_POOL_SIZE")),
+    idle_timeout=float(getenv("AGIXT_POOL_IDLE_TIMEOUT")),
+    max_connections=int(getenv("AGIXT_MAX_CONNECTIONS")),
+)
+
+
+singleflight = SingleFlight()
+unauthorized_handlers = []
+metrics.register_counter(
+    "agixt_singleflight_requests_total",
+    "GET requests sent to AGiXT through the single-flight layer",
+    lambda: singleflight.requests,
+)
+metrics.register_counter(
+    "agixt_singleflight_coalesced_total",
+    "GET requests answered by an identical request already in flight",
+    lambda: singleflight.coalesced,
+)
+
+
+CONNECT_TIMEOUT = float(getenv("AGIXT_CONNECT_TIMEOUT"))
+READ_TIMEOUT = float(getenv("AGIXT_READ_TIMEOUT"))
+LONG_READ_TIMEOUT = float(getenv("AGIXT_LONG_READ_TIMEOUT"))
+RETRIES = int(getenv("AGIXT_RETRIES"))
+HEDGING = getenv("AGIXT_HEDGING").lower() == "true"
+# Prompts, chain runs, training and completions legitimately take minutes. Only these
+# routes; prompt and chain metadata share their prefixes but answer at once.
+LONG_RUNNING = re.compile(
+    r"^(/api/agent/[^/]+/prompt"
+    r"|/api/chain/[^/]+/run(/step/\d+)?"
+    r"|/api/agent/[^/]+/learn/[^/]+"
+    r"|/v1/chat/completions)$"
+)
+RETRY_STATUSES = {502, 503, 504}
+
+breakers = {}
+breakers_lock = threading.Lock()
+latency = LatencyTracker()
+hedge_executor = ThreadPoolExecutor(
+    max_workers=int(getenv("AGIXT_PREFETCH_WORKERS")),
+    thread_name_prefix="agixt-hedge",
+)
+retries = {"retried": 0, "hedged": 0}
+retries_lock = threading.Lock()
+metrics.register_counter(
+    "agixt_retries_total",
+    "AGiXT GET requests retried after a failure",
+    lambda: retries["retried"],
+)
+metrics.register_counter(
+    "agixt_hedged_total",
+    "AGiXT GET requests duplicated after running past their p95 latency",
+    lambda: retries["hedged"],
+)
+metrics.register_counter(
+    "agixt_circuit_opened_total",
+    "Times an AGiXT circuit breaker opened",
+    lambda: sum(breaker.opened for breaker in breakers.values()),
+)
+
+
+def count_retry(kind: str):
+    with retries_lock:
+        retries[kind] += 1
+
+
+def get_breaker(netloc: str) -> CircuitBreaker:
+    with breakers_lock:
+        if netloc not in breakers:
+            breakers[netloc] = CircuitBreaker(
+                threshold=int(getenv("AGIXT_BREAKER_THRESHOLD")),
+                cooldown=float(getenv("AGIXT_BREAKER_COOLDOWN")),
+            )
+        return breakers[netloc]
+
+
+read_timeout_override = contextvars.ContextVar("read_timeout_override", default=None)
+
+
+@contextlib.contextmanager
+def read_timeout(seconds: float):
+    """
+    Sets the read timeout of the AGiXT requests made in this block, for callers with
+    their own budget, such as one website of a training batch.
+    """
+    token = read_timeout_override.set(seconds)
+    try:
+        yield
+    finally:
+        read_timeout_override.reset(token)
+
+
+def timeout_for(path: str):
+    if read_timeout_override.get() is not None:
+        return (CONNECT_TIMEOUT, read_timeout_override.get())
+    if LONG_RUNNING.match(path):
+        return (CONNECT_TIMEOUT, LONG_READ_TIMEOUT)
+    return (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+def hedged(send, endpoint: str):
+    delay = latency.p95(endpoint)
+    # Without a p95 there is nothing to hedge against, so the caller sends it itself.
+    if delay is None:
+        return send()
+    first = hedge_executor.submit(contextvars.copy_context().run, send)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result()
+    count_retry("hedged")
+    pending = {first, hedge_executor.submit(contextvars.copy_context().run, send)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def request(method: str, url: str, headers: dict = None, **kwargs):
+    """
+    Sends a request to AGiXT through the caller's pooled session within a latency budget.
+
+    Every request gets connect and read timeouts. GETs are idempotent, so they are
+    retried with jittered backoff on connection errors, timeouts and gateway errors,
+    and with `AGIXT_HEDGING` enabled a duplicate is sent once the first runs past
+    the endpoint's p95. After repeated failures the backend's circuit opens and
+    requests fail fast with `CircuitOpenError` until a trial request succeeds.
+    """
+    token = (headers or {}).get("Authorization", "")
+    parsed = urllib.parse.urlsplit(url)
+    endpoint = f"{method} {parsed.path}"
+    breaker = get_breaker(parsed.netloc)
+    kwargs.setdefault("timeout", timeout_for(parsed.path))
+
+    def send_once():
+        start = time.perf_counter()
+        response = pool.get(token).session.request(
+            method, url, headers=headers, **kwargs
+        )
+        latency.observe(endpoint, time.perf_counter() - start)
+        if response.status_code == 401:
+            for handler in unauthorized_handlers:
+                handler(token)
+        return response
+
+    def send():
+        attempts = RETRIES + 1 if method == "GET" else 1
+        for attempt in range(attempts):
+            if attempt > 0:
+                count_retry("retried")
+                time.sleep(backoff(attempt - 1))
+            breaker.before(parsed.netloc)
+            try:
+                if method == "GET" and HEDGING:
+                    response = hedged(send_once, endpoint)
+                else:
+                    response = send_once()
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.failure()
+                if attempt == attempts - 1:
+                    raise
+                continue
+            except Exception:
+                breaker.failure()
+                raise
+            if response.status_code in RETRY_STATUSES:
+                breaker.failure()
+                if attempt < attempts - 1:
+                    continue
+            else:
+                breaker.success()
+            return response
+
+    if method != "GET":
+        return send()
+    # Identical GETs in flight for the same user share one backend request.
+    key = (
+        token_hash(token),
+        url,
+        json.dumps(kwargs.get("params"), sort_keys=True, default=str),
+        json.dumps(kwargs.get("json"), sort_keys=True, default=str),
+    )
+    return singleflight.do(key, send)
+
+
+class PooledRequests:
+    """
+    Stand-in for the `requests` module used inside `agixtsdk`, so every SDK call
+    goes through the calling user's pooled session instead of a new connection.
+    """
+
+    def get(self, url=None, **kwargs):
+        return request("GET", url, **kwargs)
+
+    def post(self, url=None, **kwargs):
+        return request("POST", url, **kwargs)
+
+    def put(self, url=None, **kwargs):
+        return request("PUT", url, **kwargs)
+
+    def patch(self, url=None, **kwargs):
+        return request("PATCH", url, **kwargs)
+
+    def delete(self, url=None, **kwargs):
+        return request("DELETE", url, **kwargs)
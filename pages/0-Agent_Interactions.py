@@ -3,6 +3,8 @@ import os
 from components.selectors import AGiXTSelectors
 from components.docs import agixt_docs, predefined_injection_variables
 from ApiClient import get_agixt
+from components.jobs import queue
+from Globals import getenv
 
 st.set_page_config(
     page_title="Agent Interactions",
@@ -31,27 +33,63 @@ mode = st.selectbox(
 )
 
 agent_name = selectors.agent_selection() if mode != "Chains" else ""
+# The history above was fetched by this full run, so it already holds the last
+# exchange shown under the input.
+st.session_state.pop("last_exchange", None)
 
-if mode == "Chat" or mode == "Instruct":
-    args = selectors.prompt_options()
-    args["user_input"] = st.text_area("User Input")
-    args["prompt_name"] = "Chat" if mode != "Instruct" else "instruct"
-if mode == "Prompt":
-    args = selectors.prompt_selection()
 
-if mode != "Chains":
+def show_exchange(user_input: str, response):
+    if user_input:
+        with st.chat_message("user"):
+            st.markdown(user_input)
+    with st.chat_message("assistant"):
+        if isinstance(response, str):
+            st.markdown(response)
+        else:
+            return st.write_stream(response)
+    return response
+
+
+# Prompt options, the input and sending rerun only this fragment. The history panel
+# and the rest of the page are neither re-executed nor refetched.
+@st.fragment
+def message_input(agent_name: str, mode: str):
+    if mode == "Prompt":
+        args = selectors.prompt_selection()
+    else:
+        args = selectors.prompt_options()
+        args["user_input"] = st.text_area("User Input")
+        args["prompt_name"] = "Chat" if mode != "Instruct" else "instruct"
     if st.button("Send"):
         args["conversation_name"] = st.session_state["conversation"]
-        with st.spinner("Thinking, please wait..."):
-            response = ApiClient.prompt_agent(
+        if mode == "Prompt":
+            with st.spinner("Thinking, please wait..."):
+                response = ApiClient.prompt_agent(
+                    agent_name=agent_name,
+                    prompt_name=args["prompt_name"],
+                    prompt_args=args,
+                )
+        else:
+            response = ApiClient.stream_chat(
                 agent_name=agent_name,
                 prompt_name=args["prompt_name"],
                 prompt_args=args,
             )
-            if response:
-                st.rerun()
+        # The reply is written as it streams in and kept until the next full rerun
+        # shows it in the history.
+        st.session_state["last_exchange"] = {
+            "conversation": args["conversation_name"],
+            "user_input": args.get("user_input", ""),
+            "response": show_exchange(args.get("user_input", ""), response),
+        }
+        return
+    exchange = st.session_state.get("last_exchange")
+    if exchange and exchange["conversation"] == st.session_state["conversation"]:
+        show_exchange(exchange["user_input"], exchange["response"])
 
-if mode == "Chains":
+
+@st.fragment
+def chain_runner():
     chain_names = ApiClient.get_chains()
     agent_override = st.checkbox("Override Agent")
     if agent_override:
@@ -80,21 +118,27 @@ if mode == "Chains":
     if single_step:
         if st.button("Run Chain Step"):
             if chain_name:
-                responses = ApiClient.run_chain_step(
+                queue.submit(
+                    ApiClient.owner,
+                    f"Chain '{chain_name}' step {from_step}",
+                    ApiClient.run_chain_step,
                     chain_name=chain_name,
                     user_input=user_input,
                     agent_name=agent_name,
                     step_number=from_step,
                     chain_args=args,
                 )
-                st.success(f"Chain '{chain_name}' executed.")
-                st.write(responses)
+                # A full rerun starts the job panel polling.
+                st.rerun()
             else:
                 st.error("Chain name is required.")
     else:
         if st.button("Run Chain"):
             if chain_name:
-                responses = ApiClient.run_chain(
+                queue.submit(
+                    ApiClient.owner,
+                    f"Chain '{chain_name}'",
+                    ApiClient.run_chain,
                     chain_name=chain_name,
                     user_input=user_input,
                     agent_name=agent_name,
@@ -102,7 +146,44 @@ if mode == "Chains":
                     from_step=from_step,
                     chain_args=args,
                 )
-                st.success(f"Chain '{chain_name}' executed.")
-                st.write(responses)
+                st.rerun()
             else:
                 st.error("Chain name is required.")
+
+
+def chain_jobs(polling: bool):
+    # Chain runs execute on the background job queue. While any is queued or running
+    # this panel reruns on its own to show progress; once they are all done, a full
+    # rerun stops the polling and refreshes the conversation history.
+    jobs = queue.jobs(ApiClient.owner)
+    if not jobs:
+        return
+    st.subheader("Chain Runs")
+    for job in jobs:
+        active = job["status"] in ("queued", "running")
+        with st.expander(f"{job['title']}: {job['status']}", expanded=active):
+            if job["finished"] and job["started"]:
+                st.caption(f"Ran for {job['finished'] - job['started']:.1f} seconds.")
+            if active:
+                st.button(
+                    "Cancel",
+                    key=f"cancel_job_{job['id']}",
+                    on_click=queue.cancel,
+                    args=(ApiClient.owner, job["id"]),
+                )
+            elif job["status"] == "succeeded":
+                st.write(job["result"])
+            elif job["error"]:
+                st.error(job["error"])
+    if polling and not queue.active(ApiClient.owner):
+        st.rerun()
+
+
+if mode == "Chains":
+    chain_runner()
+    polling = queue.active(ApiClient.owner) > 0
+    st.fragment(
+        chain_jobs, run_every=float(getenv("JOB_POLL_INTERVAL")) if polling else None
+    )(polling)
+else:
+    message_input(agent_name, mode)
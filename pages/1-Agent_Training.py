@@ -1,9 +1,12 @@
 import os
-import base64
+import time
 import streamlit as st
 from components.selectors import AGiXTSelectors
 from ApiClient import get_agixt
 from components.docs import agixt_docs, predefined_memory_collections
+from components.spool import SpoolFull, spool
+from components.ingest import ingest_files, learn_text
+from components.training import learn_urls, ledger, normalize_urls
 
 st.set_page_config(
     page_title="Agent Training",
@@ -15,6 +18,86 @@ ApiClient = get_agixt()
 if not ApiClient:
     st.stop()
 selectors = AGiXTSelectors(ApiClient=ApiClient)
+
+
+def train_websites(agent_name: str, urls: list, collection_number) -> list:
+    # Shows each website's outcome as it finishes and returns the ones that failed.
+    if not urls:
+        return []
+    progress = st.progress(0.0, text=f"Training from {len(urls)} websites...")
+    table = st.empty()
+    rows = {url: {"Website": url, "Status": "Queued", "Seconds": None} for url in urls}
+    failed = []
+    for done, (url, error, seconds) in enumerate(
+        learn_urls(ApiClient, agent_name, urls, collection_number), start=1
+    ):
+        rows[url].update(Status=error or "Learned", Seconds=round(seconds, 1))
+        if error:
+            failed.append(url)
+        progress.progress(done / len(urls), text=f"{done} of {len(urls)} websites done")
+        table.dataframe(list(rows.values()))
+    if failed:
+        st.error(f"{len(failed)} of {len(urls)} websites failed.")
+    else:
+        st.success(f"Agent '{agent_name}' has learned from {len(urls)} websites.")
+    return failed
+
+
+def train_files(agent_name: str, files: dict, collection_number, extract_text: bool):
+    # Shows each file's outcome and the aggregate throughput as files finish.
+    # `files` maps the SHA-256 of each file to its name and spool path.
+    digests = list(files)
+    sizes = [os.path.getsize(files[digest][1]) for digest in digests]
+    rows = [
+        {"File": files[digest][0], "Status": "Queued", "MB": round(size / 1e6, 2)}
+        for digest, size in zip(digests, sizes)
+    ]
+    progress = st.progress(0.0, text=f"Training from {len(files)} files...")
+    table = st.empty()
+    start = time.perf_counter()
+    learned_bytes = 0
+    failed = 0
+    owner = ApiClient.owner
+
+    def learned(index: int):
+        # Runs on the thread that sent the file, even after a rerun stops the page.
+        ledger.record(
+            owner,
+            agent_name,
+            collection_number,
+            digests[index],
+            files[digests[index]][0],
+        )
+
+    for done, (index, error, sent, seconds) in enumerate(
+        ingest_files(
+            ApiClient,
+            agent_name,
+            list(files.values()),
+            collection_number,
+            extract_text=extract_text,
+            learned=learned,
+        ),
+        start=1,
+    ):
+        if error:
+            failed += 1
+        else:
+            learned_bytes += sizes[index]
+        rows[index].update(Status=error or "Learned", Seconds=round(seconds, 1))
+        elapsed = time.perf_counter() - start
+        progress.progress(
+            done / len(files),
+            text=f"{done} of {len(files)} files done, "
+            f"{learned_bytes / 1e6 / elapsed:.1f} MB/s",
+        )
+        table.dataframe(rows)
+    if failed:
+        st.error(f"{failed} of {len(files)} files failed.")
+    else:
+        st.success(f"Agent '{agent_name}' has learned from {len(files)} files.")
+
+
 st.header("Agent Training")
 agent_name = selectors.agent_selection()
 if agent_name:
@@ -41,29 +124,22 @@ if agent_name:
         learn_url = st.text_area(
             "Enter Website links for the agent to learn from.. (One URL per line)"
         )
+        # Failures are kept with the agent and collection they were meant for, so a
+        # retry after switching either does not teach those websites to another one.
+        target = (agent_name, str(collection_number))
+        failed_websites = st.session_state.setdefault("failed_websites", {})
         if st.button("Train from Websites"):
-            if learn_url:
-                with st.spinner("Training, please wait..."):
-                    if "\n" in learn_url:
-                        learn_url = learn_url.split("\n")
-                        for url in learn_url:
-                            learn = ApiClient.learn_url(
-                                agent_name=agent_name,
-                                url=url,
-                                collection_number=collection_number,
-                            )
-                        st.success(
-                            f"Agent '{agent_name}' has learned from the following websites: {', '.join(learn_url)}."
-                        )
-                    else:
-                        learn = ApiClient.learn_url(
-                            agent_name=agent_name,
-                            url=learn_url,
-                            collection_number=collection_number,
-                        )
-                        st.success(
-                            f"Agent '{agent_name}' has learned from the website: {learn_url}."
-                        )
+            urls, invalid = normalize_urls(learn_url)
+            for line in invalid:
+                st.warning(f"Skipped '{line}', which is not a web address.")
+            failed_websites[target] = train_websites(
+                agent_name, urls, collection_number
+            )
+        failed = failed_websites.get(target)
+        if failed and st.button("Retry failed websites"):
+            failed_websites[target] = train_websites(
+                agent_name, failed, collection_number
+            )
     elif mode == "File":
         st.markdown("### Train from Files")
         st.markdown(
@@ -72,32 +148,42 @@ if agent_name:
         learn_file_upload = st.file_uploader(
             "Upload a file for the agent to learn from.", accept_multiple_files=True
         )
-        if learn_file_upload is not None:
-            for learn_file_upload in learn_file_upload.copy():
-                learn_file_path = os.path.join(
-                    "data", "uploaded_files", learn_file_upload.name
-                )
-                if not os.path.exists(os.path.dirname(learn_file_path)):
-                    os.makedirs(os.path.dirname(learn_file_path))
-                with open(learn_file_path, "wb") as f:
-                    f.write(learn_file_upload.getbuffer())
-                with st.spinner(
-                    "Training, please wait... This may take awhile depending on the size of the file."
-                ):
-                    ApiClient.learn_file(
-                        agent_name=agent_name,
-                        file_name=learn_file_path,
-                        file_content=base64.b64encode(learn_file_upload.read()).decode(
-                            "utf-8"
-                        ),
-                        collection_number=collection_number,
-                    )
-                st.success(
-                    "Agent '"
-                    + agent_name
-                    + "' has learned from file: "
-                    + learn_file_upload.name
-                )
+        force = st.button("Learn these files again")
+        extract_text = st.checkbox(
+            "Send plain text, Markdown and CSV files as text instead of base64"
+        )
+        spooled = st.session_state.setdefault("spooled_uploads", {})
+        queued = {}
+        # The spool keeps every file of the batch until it has been trained.
+        with spool.batch() as batch:
+            try:
+                for upload in learn_file_upload or []:
+                    # The uploader keeps its files across reruns; each is hashed and
+                    # spooled once, and sent to AGiXT only if this agent has not
+                    # learned it yet.
+                    digest = spooled.get(upload.file_id)
+                    path = digest and spool.get(digest, upload.name, batch)
+                    if not path:
+                        digest, path = spool.put(upload, upload.name, batch)
+                        spooled[upload.file_id] = digest
+                    if digest in queued:
+                        st.info(
+                            f"{upload.name} has the same content as {queued[digest][0]}."
+                        )
+                        continue
+                    if not force and ledger.learned(
+                        ApiClient.owner, agent_name, collection_number, digest
+                    ):
+                        st.info(
+                            f"Agent '{agent_name}' has already learned {upload.name}."
+                        )
+                        continue
+                    queued[digest] = (upload.name, path)
+            except SpoolFull as e:
+                st.error(str(e))
+                queued = {}
+            if queued:
+                train_files(agent_name, queued, collection_number, extract_text)
     elif mode == "Text":
         st.markdown("### Train from Text")
         st.markdown(
@@ -106,17 +192,24 @@ if agent_name:
         user_input = st.text_input(
             "Enter some short text, description, or question to associate the learned text with."
         )
-        learn_text = st.text_area("Enter some text for the agent to learn from.")
+        text = st.text_area("Enter some text for the agent to learn from.")
         if st.button("Train from Text"):
-            if learn_text:
-                with st.spinner("Training, please wait..."):
-                    learn = ApiClient.learn_text(
-                        agent_name=agent_name,
-                        user_input=user_input,
-                        text=learn_text,
-                        collection_number=collection_number,
+            if text:
+                try:
+                    with st.spinner("Training, please wait..."):
+                        learn_text(
+                            ApiClient,
+                            agent_name=agent_name,
+                            user_input=user_input,
+                            text=text,
+                            collection_number=collection_number,
+                        )
+                except Exception as e:
+                    st.error(f"Training from the text failed: {e}")
+                else:
+                    st.success(
+                        f"Agent '{agent_name}' has learned from the text provided."
                     )
-                st.success(f"Agent '{agent_name}' has learned from the text provided.")
 
     elif mode == "GitHub Repository":
         st.markdown("### Train from GitHub Repository")
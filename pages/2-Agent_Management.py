@@ -1,7 +1,8 @@
 import streamlit as st
-from ApiClient import get_agixt
+from ApiClient import get_agixt, prefetch
 from components.selectors import AGiXTSelectors
 from components.docs import agixt_docs
+from components.training import ledger
 
 st.set_page_config(
     page_title="Agent Management",
@@ -17,9 +18,36 @@ selectors = AGiXTSelectors(ApiClient=ApiClient)
 st.title("Agent Management")
 
 
+SERVICES = ["llm", "vision", "tts", "transcription", "image", "embeddings"]
+PROVIDER_SETTING_KEYS = [
+    "provider",
+    "vision_provider",
+    "tts_provider",
+    "transcription_provider",
+    "image_provider",
+]
+# Everything the page needs that does not depend on a widget is fetched at once.
+page_data = prefetch(
+    {
+        "agents": lambda: ApiClient.get_agents(),
+        "extensions": lambda: ApiClient.get_extensions(),
+        **{
+            service: (
+                lambda service=service: ApiClient.get_providers_by_service(service)
+            )
+            for service in SERVICES
+        },
+    }
+)
+provider_catalog = {}
+
+
 def render_provider_settings(provider_name, agent_settings, provider_settings):
     global ApiClient
-    settings = ApiClient.get_provider_settings(provider_name=provider_name)
+    if provider_name in provider_catalog:
+        settings = dict(provider_catalog[provider_name])
+    else:
+        settings = ApiClient.get_provider_settings(provider_name=provider_name)
     for key, value in settings.items():
         if key in provider_settings:
             # Use existing provider settings if available
@@ -38,7 +66,7 @@ agent_action = st.selectbox("Action", ["Create Agent", "Modify Agent", "Delete A
 if agent_action == "Create Agent":
     agent_name = st.text_input("Enter the agent name:")
 else:
-    agent_names = [agent["name"] for agent in ApiClient.get_agents()]
+    agent_names = [agent["name"] for agent in page_data["agents"]]
     agent_name = st.selectbox("Select an agent:", agent_names)
 
 
@@ -51,6 +79,24 @@ else:
     agent_settings = {}
     agent_commands = {}
 
+# Settings for the providers the agent already uses, plus each list's default.
+default_providers = {
+    agent_settings[key] for key in PROVIDER_SETTING_KEYS if agent_settings.get(key)
+}
+default_providers.update(
+    page_data[service][0] for service in ["llm", "transcription"] if page_data[service]
+)
+default_providers.add("None")
+provider_catalog = prefetch(
+    {
+        provider: (
+            lambda provider=provider: ApiClient.get_provider_settings(
+                provider_name=provider
+            )
+        )
+        for provider in default_providers
+    }
+)
 provider_settings = {}
 
 st.header("Select Providers")
@@ -58,7 +104,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Language Provider")
-    language_providers = ApiClient.get_providers_by_service("llm")
+    language_providers = page_data["llm"]
     selected_language_provider = st.selectbox(
         "Select language provider:",
         language_providers,
@@ -76,7 +122,7 @@ with col1:
 
 with col2:
     st.subheader("Vision Provider (Optional)")
-    vision_providers = ["None"] + ApiClient.get_providers_by_service("vision")
+    vision_providers = ["None"] + page_data["vision"]
     vp = agent_settings.get("vision_provider", "None")
     if not vp:
         vp = "None"
@@ -95,7 +141,7 @@ with col2:
         )
 
     st.subheader("Text to Speech Provider")
-    tts_providers = ApiClient.get_providers_by_service("tts")
+    tts_providers = page_data["tts"]
     tts_providers = ["None"] + tts_providers
     selected_tts_provider = st.selectbox(
         "Select text to speech provider:",
@@ -113,7 +159,7 @@ with col2:
     )
 
     st.subheader("Speech to Text Provider")
-    stt_providers = ApiClient.get_providers_by_service("transcription")
+    stt_providers = page_data["transcription"]
     selected_stt_provider = st.selectbox(
         "Select speech to text provider:",
         stt_providers,
@@ -129,7 +175,7 @@ with col2:
         provider_settings,
     )
     st.subheader("Image Generation Provider (Optional)")
-    image_providers = ["None"] + ApiClient.get_providers_by_service("image")
+    image_providers = ["None"] + page_data["image"]
     selected_img_provider = (
         agent_settings["image_provider"]
         if "image_provider" in agent_settings
@@ -153,7 +199,7 @@ with col2:
             provider_settings,
         )
     st.subheader("Embeddings Provider")
-    embedding_providers = ApiClient.get_providers_by_service("embeddings")
+    embedding_providers = page_data["embeddings"]
     selected_embedding_provider = st.selectbox(
         "Select embeddings provider:",
         embedding_providers,
@@ -171,7 +217,7 @@ col3, col4 = st.columns(2)
 
 with col3:
     st.subheader("Extensions")
-    extensions = ApiClient.get_extensions()
+    extensions = page_data["extensions"]
     extension_options = [extension["extension_name"] for extension in extensions]
 
     # Automatically select extensions based on enabled commands
@@ -300,4 +346,5 @@ if st.button("Save Agent Settings"):
         st.success(f"Agent '{agent_name}' updated.")
     elif agent_action == "Delete Agent":
         response = ApiClient.delete_agent(agent_name)
+        ledger.forget(ApiClient.owner, agent_name)
         st.success(f"Agent '{agent_name}' deleted.")
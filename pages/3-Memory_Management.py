@@ -3,6 +3,7 @@ import streamlit as st
 from components.selectors import AGiXTSelectors
 from ApiClient import get_agixt
 from components.docs import agixt_docs, predefined_memory_collections
+from components.training import ledger
 from datetime import datetime
 
 st.set_page_config(
@@ -59,6 +60,12 @@ if agent_name:
                     agent_name=agent_name, collection_number=collection_number
                 )
                 if res:
+                    # Collection 0 wipes all of the agent's memories.
+                    ledger.forget(
+                        ApiClient.owner,
+                        agent_name,
+                        collection_number if collection_number else None,
+                    )
                     st.success("Memories wiped successfully.")
     else:
         collection_number = "0"
@@ -37,6 +37,7 @@ if new_prompt_category:
     prompt_category = st.text_input("New Prompt Category Name")
     if st.button("Create Prompt Category"):
         prompt_list = ApiClient.get_prompts(prompt_category=prompt_category)
+        ApiClient.invalidate(["get_prompt_categories"])
         st.success(
             f"Prompt category '{prompt_category}' created. Uncheck the `New Prompt Category` add new prompts."
         )
@@ -1,9 +1,12 @@
 import json
+import re
 import streamlit as st
 from ApiClient import get_agixt
 from components.docs import agixt_docs, predefined_injection_variables
 from components.selectors import AGiXTSelectors
 
+STEP_EDITOR_KEY = re.compile(r"(^|_)\d+(_|$)|^add_step_")
+
 st.set_page_config(
     page_title="Chain Management",
     page_icon=":chains:",
@@ -15,7 +18,6 @@ ApiClient = get_agixt()
 if not ApiClient:
     st.stop()
 selectors = AGiXTSelectors(ApiClient=ApiClient)
-st.session_state = {}
 chain_names = ApiClient.get_chains()
 agents = ApiClient.get_agents()
 st.header("Chain Management")
@@ -29,6 +31,14 @@ if chain_action == "Create Chain":
 else:
     chain_name = st.selectbox("Chains", options=chain_names)
 
+# Step editor widgets are keyed by step number, so when another chain or action is
+# opened their state is dropped; otherwise its steps would show the last chain's edits.
+if st.session_state.get("chain_editor") != (chain_action, chain_name):
+    for key in list(st.session_state):
+        if STEP_EDITOR_KEY.search(str(key)):
+            del st.session_state[key]
+    st.session_state["chain_editor"] = (chain_action, chain_name)
+
 if chain_action == "Create Chain":
     action_button = st.button("Create New Chain")
     # Import Chain
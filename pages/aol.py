@@ -1,3 +0,0 @@
-from components.Auth import sso_redirect
-
-sso_redirect(provider="aol")
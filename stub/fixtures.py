@@ -0,0 +1,127 @@
+import random
+from datetime import datetime, timedelta
+
+SERVICES = {
+    "llm": ["openai", "anthropic", "ezlocalai", "gpt4free"],
+    "vision": ["openai", "anthropic"],
+    "tts": ["openai", "elevenlabs", "streamlabs"],
+    "transcription": ["default", "openai"],
+    "image": ["openai", "stability"],
+    "embeddings": ["default", "openai"],
+}
+
+
+class Fixtures:
+    """
+    Deterministic AGiXT data of configurable size for the stand-in server.
+
+    The same options always produce the same agents, conversations, chains,
+    prompts and memories, so benchmark runs are comparable.
+    """
+
+    def __init__(
+        self,
+        agents: int = 5,
+        conversations: int = 20,
+        messages: int = 50,
+        chains: int = 10,
+        chain_steps: int = 5,
+        prompts: int = 20,
+        extensions: int = 10,
+        memories: int = 50,
+        seed: int = 0,
+    ):
+        self.random = random.Random(seed)
+        self.start = datetime(2024, 1, 1)
+        self.agents = {
+            f"Agent {i}" if i else "OpenAI": self.agent_settings(i)
+            for i in range(agents)
+        }
+        self.agent_commands = {name: {} for name in self.agents}
+        self.conversations = {
+            f"Conversation {i}": self.conversation(messages)
+            for i in range(conversations)
+        }
+        self.chains = {
+            f"Chain {i}": self.chain_steps(chain_steps) for i in range(chains)
+        }
+        self.prompts = {
+            "Default": {
+                name: f"{name} prompt for {{user_input}} with {{context}}."
+                for name in ["Chat", "instruct", "Custom Input"]
+                + [f"Prompt {i}" for i in range(prompts)]
+            }
+        }
+        self.extensions = [self.extension(i) for i in range(extensions)]
+        self.memories = [self.memory(i) for i in range(memories)]
+
+    def text(self, words: int) -> str:
+        return " ".join(
+            self.random.choice(["lorem", "ipsum", "dolor", "sit", "amet", "agent"])
+            for _ in range(words)
+        )
+
+    def timestamp(self, offset: int) -> str:
+        return (self.start + timedelta(seconds=offset)).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+    def agent_settings(self, i: int) -> dict:
+        return {
+            "provider": "openai",
+            "tts_provider": "None",
+            "transcription_provider": "default",
+            "embeddings_provider": "default",
+            "mode": "prompt",
+            "prompt_name": "Chat",
+            "prompt_category": "Default",
+            "OPENAI_API_KEY": "",
+        }
+
+    def conversation(self, messages: int) -> list:
+        return [
+            {
+                "id": str(i),
+                "role": "USER" if i % 2 == 0 else "OpenAI",
+                "message": self.text(self.random.randint(5, 60)),
+                "timestamp": self.timestamp(i * 30),
+            }
+            for i in range(messages)
+        ]
+
+    def chain_steps(self, steps: int) -> list:
+        return [
+            {
+                "step": i + 1,
+                "agent_name": "OpenAI",
+                "prompt_type": "Prompt",
+                "prompt": {
+                    "prompt_name": "Chat",
+                    "prompt_category": "Default",
+                    "user_input": "{user_input}",
+                },
+            }
+            for i in range(steps)
+        ]
+
+    def extension(self, i: int) -> dict:
+        return {
+            "extension_name": f"Extension {i}",
+            "description": self.text(10),
+            "settings": [f"EXTENSION_{i}_API_KEY"],
+            "commands": [
+                {
+                    "friendly_name": f"Command {i}.{j}",
+                    "description": self.text(8),
+                    "command_args": {"query": ""},
+                }
+                for j in range(3)
+            ],
+        }
+
+    def memory(self, i: int) -> dict:
+        return {
+            "id": f"memory-{i}",
+            "additional_metadata": self.text(40),
+            "external_source_name": f"https://example.com/{i}",
+            "relevance_score": round(self.random.random(), 4),
+            "timestamp": self.timestamp(i * 60),
+        }
@@ -0,0 +1,632 @@
+"""
+Local stand-in for the AGiXT and MagicalAuth backends, for benchmarking and testing
+this frontend without a live AGiXT.
+
+It implements the routes the app calls through `components/Auth.py` and `agixtsdk`,
+serves fixture data of configurable size, and can inject latency and errors per route.
+
+    python -m stub.server --port 7437 --conversations 5000 --chain-steps 200 \\
+        --latency "GET /api/conversation=0.25" --errors "POST /api/agent/*/prompt=0.1:500"
+
+Then run the app with `AGIXT_URI=http://localhost:7437` and log in with
+`http://localhost:8501/?token=stub-token`.
+"""
+
+import argparse
+import fnmatch
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from stub.fixtures import SERVICES, Fixtures
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TOKEN = "stub-token"
+# Content codings the stand-in can decode in request bodies.
+CONTENT_CODINGS = ["gzip", "zstd"] if zstandard else ["gzip"]
+
+
+def decode_body(raw: bytes, coding: str) -> bytes:
+    if coding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return zlib.decompress(raw, 31)
+
+
+def parse_rules(rules: list) -> list:
+    """
+    Parses `"[METHOD ]PATH_GLOB=VALUE"` rules, for example `"GET /api/agent/*=0.2"`.
+    """
+    parsed = []
+    for rule in rules or []:
+        pattern, value = rule.rsplit("=", 1)
+        method, _, path = pattern.strip().rpartition(" ")
+        parsed.append((method.upper() or "*", path, value))
+    return parsed
+
+
+def match_rule(rules: list, method: str, path: str):
+    for rule_method, pattern, value in rules:
+        if rule_method in ("*", method) and fnmatch.fnmatchcase(path, pattern):
+            return value
+    return None
+
+
+class Route:
+    def __init__(self, method: str, pattern: str, handler):
+        self.method = method
+        self.regex = re.compile(
+            "^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$"
+        )
+        self.handler = handler
+
+
+class StandIn:
+    def __init__(
+        self,
+        fixtures: Fixtures,
+        latency: list = None,
+        errors: list = None,
+        token=TOKEN,
+        token_interval: float = 0.02,
+        content_codings: list = None,
+        upload_bandwidth: float = None,
+    ):
+        self.data = fixtures
+        self.latency = parse_rules(latency)
+        self.errors = parse_rules(errors)
+        self.token = token
+        self.token_interval = token_interval
+        self.content_codings = (
+            CONTENT_CODINGS if content_codings is None else content_codings
+        )
+        self.upload_bandwidth = upload_bandwidth
+        self.lock = threading.Lock()
+        self.link = threading.Lock()
+        self.requests = 0
+        self.received_bytes = 0
+        self.routes = [
+            Route("GET", "/v1/user", self.get_user),
+            Route("POST", "/v1/user", self.register),
+            Route("POST", "/v1/login", self.login),
+            Route("POST", "/v1/oauth2/{provider}", self.oauth2),
+            Route("POST", "/v1/chat/completions", self.chat_completions),
+            Route("GET", "/api/provider", self.get_providers),
+            Route("GET", "/api/providers/service/{service}", self.providers_by_service),
+            Route("GET", "/api/provider/{provider}", self.provider_settings),
+            Route("GET", "/api/embedding_providers", self.embedding_providers),
+            Route("GET", "/api/agent", self.get_agents),
+            Route("POST", "/api/agent", self.add_agent),
+            Route("POST", "/api/agent/import", self.add_agent),
+            Route("GET", "/api/agent/{agent}", self.get_agent),
+            Route("PUT", "/api/agent/{agent}", self.update_agent),
+            Route("PATCH", "/api/agent/{agent}", self.rename_agent),
+            Route("DELETE", "/api/agent/{agent}", self.delete_agent),
+            Route("PUT", "/api/agent/{agent}/commands", self.update_commands),
+            Route("GET", "/api/agent/{agent}/command", self.get_commands),
+            Route("POST", "/api/agent/{agent}/prompt", self.prompt_agent),
+            Route("POST", "/api/agent/{agent}/learn/{source}", self.learn),
+            Route("POST", "/api/agent/{agent}/memory/{collection}/query", self.query),
+            Route("DELETE", "/api/agent/{agent}/memory", self.message),
+            Route("DELETE", "/api/agent/{agent}/memory/{collection}", self.message),
+            Route(
+                "DELETE",
+                "/api/agent/{agent}/memory/{collection}/{memory}",
+                self.message,
+            ),
+            Route("GET", "/api/conversations", self.get_conversations),
+            Route("GET", "/api/conversation", self.get_conversation),
+            Route("POST", "/api/conversation", self.new_conversation),
+            Route("PUT", "/api/conversation", self.rename_conversation),
+            Route("DELETE", "/api/conversation", self.delete_conversation),
+            Route("POST", "/api/conversation/message", self.new_message),
+            Route("GET", "/api/chain", self.get_chains),
+            Route("POST", "/api/chain", self.add_chain),
+            Route("POST", "/api/chain/import", self.import_chain),
+            Route("GET", "/api/chain/{chain}", self.get_chain),
+            Route("PUT", "/api/chain/{chain}", self.rename_chain),
+            Route("DELETE", "/api/chain/{chain}", self.delete_chain),
+            Route("GET", "/api/chain/{chain}/args", self.get_chain_args),
+            Route("GET", "/api/chain/{chain}/responses", self.get_chain_responses),
+            Route("POST", "/api/chain/{chain}/run", self.run_chain),
+            Route("POST", "/api/chain/{chain}/run/step/{step}", self.run_chain),
+            Route("POST", "/api/chain/{chain}/step", self.add_step),
+            Route("PUT", "/api/chain/{chain}/step/{step}", self.update_step),
+            Route("PATCH", "/api/chain/{chain}/step/move", self.message),
+            Route("DELETE", "/api/chain/{chain}/step/{step}", self.delete_step),
+            Route("GET", "/api/prompt/categories", self.get_categories),
+            Route("GET", "/api/prompt/{category}", self.get_prompts),
+            Route("POST", "/api/prompt/{category}", self.add_prompt),
+            Route("GET", "/api/prompt/{category}/{prompt}", self.get_prompt),
+            Route("PUT", "/api/prompt/{category}/{prompt}", self.update_prompt),
+            Route("PATCH", "/api/prompt/{category}/{prompt}", self.rename_prompt),
+            Route("DELETE", "/api/prompt/{category}/{prompt}", self.delete_prompt),
+            Route("GET", "/api/prompt/{category}/{prompt}/args", self.get_prompt_args),
+            Route("GET", "/api/extensions", self.get_extensions),
+            Route("GET", "/api/extensions/settings", self.get_extension_settings),
+            Route("GET", "/api/extensions/{command}/args", self.get_command_args),
+        ]
+
+    def dispatch(self, method: str, path: str, headers, body: dict):
+        with self.lock:
+            self.requests += 1
+        delay = match_rule(self.latency, method, path)
+        if delay:
+            low, _, high = delay.partition("-")
+            time.sleep(random.uniform(float(low), float(high or low)))
+        error = match_rule(self.errors, method, path)
+        if error:
+            probability, _, status = error.partition(":")
+            if random.random() < float(probability):
+                return int(status or 500), {"detail": "Injected error"}
+        for route in self.routes:
+            match = route.regex.match(path)
+            if match and route.method == method:
+                if not path.startswith("/v1/") and not self.authorized(headers):
+                    return 401, {"detail": "Invalid API Key"}
+                with self.lock:
+                    return route.handler(
+                        body=body, headers=headers, **match.groupdict()
+                    )
+        return 404, {"detail": "Not Found"}
+
+    def authorized(self, headers) -> bool:
+        token = str(headers.get("Authorization", "")).replace("Bearer ", "")
+        return self.token is None or token == self.token
+
+    def message(self, **kwargs):
+        return 200, {"message": "Success"}
+
+    def get_user(self, headers, **kwargs):
+        if not self.authorized(headers):
+            return 401, {"detail": "Invalid token"}
+        return 200, {
+            "email": "operator@example.com",
+            "first_name": "Stub",
+            "last_name": "Operator",
+        }
+
+    def register(self, body, **kwargs):
+        return 200, {
+            "otp_uri": f"otpauth://totp/AGiXT:{body.get('email')}?secret=JBSWY3DPEHPK3PXP&issuer=AGiXT"
+        }
+
+    def login(self, body, **kwargs):
+        return 200, {"detail": f"{body.get('referrer', '')}?token={self.token}"}
+
+    def oauth2(self, body, provider, **kwargs):
+        return 200, {"detail": f"{body.get('referrer', '')}?token={self.token}"}
+
+    def get_providers(self, **kwargs):
+        return 200, {"providers": sorted({p for ps in SERVICES.values() for p in ps})}
+
+    def providers_by_service(self, service, **kwargs):
+        return 200, {"providers": SERVICES.get(service, [])}
+
+    def provider_settings(self, provider, **kwargs):
+        return 200, {
+            "settings": {
+                f"{provider.upper()}_API_KEY": "",
+                f"{provider.upper()}_MODEL": "default",
+                "MAX_TOKENS": 4096,
+            }
+        }
+
+    def embedding_providers(self, **kwargs):
+        return 200, {"providers": SERVICES["embeddings"]}
+
+    def get_agents(self, **kwargs):
+        return 200, {
+            "agents": [{"name": name, "status": False} for name in self.data.agents]
+        }
+
+    def add_agent(self, body, **kwargs):
+        self.data.agents[body["agent_name"]] = body.get("settings", {})
+        self.data.agent_commands[body["agent_name"]] = body.get("commands", {})
+        return 200, {"message": "Agent added", "agent_file": body["agent_name"]}
+
+    def get_agent(self, agent, **kwargs):
+        if agent not in self.data.agents:
+            return 404, {"detail": "Agent not found"}
+        return 200, {
+            "agent": {
+                "settings": self.data.agents[agent],
+                "commands": self.data.agent_commands.get(agent, {}),
+            }
+        }
+
+    def update_agent(self, agent, body, **kwargs):
+        self.data.agents[agent] = body.get("settings", {})
+        return 200, {"message": f"Agent {agent} configuration updated."}
+
+    def rename_agent(self, agent, body, **kwargs):
+        self.data.agents[body["new_name"]] = self.data.agents.pop(agent, {})
+        return 200, {"message": "Agent renamed"}
+
+    def delete_agent(self, agent, **kwargs):
+        self.data.agents.pop(agent, None)
+        return 200, {"message": f"Agent {agent} deleted."}
+
+    def update_commands(self, agent, body, **kwargs):
+        self.data.agent_commands[agent] = body.get("commands", {})
+        return 200, {"message": f"Agent {agent} commands updated."}
+
+    def get_commands(self, agent, **kwargs):
+        return 200, {"commands": self.data.agent_commands.get(agent, {})}
+
+    def append(self, conversation_name: str, role: str, message: str):
+        history = self.data.conversations.setdefault(conversation_name, [])
+        history.append(
+            {
+                "id": str(len(history)),
+                "role": role,
+                "message": message,
+                "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            }
+        )
+
+    def prompt_agent(self, agent, body, **kwargs):
+        args = body.get("prompt_args", {})
+        response = f"{agent} response: {self.data.text(40)}"
+        conversation = args.get("conversation_name")
+        if conversation:
+            self.append(conversation, "USER", str(args.get("user_input", "")))
+            self.append(conversation, agent, response)
+        return 200, {"response": response}
+
+    def chat_completions(self, body, headers, **kwargs):
+        # OpenAI-compatible chat. With `"stream": true` the reply is returned as a
+        # generator of chunks, which the handler sends as server-sent events.
+        if not self.authorized(headers):
+            return 401, {"detail": "Invalid API Key"}
+        agent = body.get("model", "")
+        messages = body.get("messages") or [{}]
+        response = f"{agent} response: {self.data.text(40)}"
+        conversation = body.get("user")
+        if conversation:
+            self.append(conversation, "USER", str(messages[-1].get("content", "")))
+            self.append(conversation, agent, response)
+        if not body.get("stream"):
+            return 200, {
+                "object": "chat.completion",
+                "model": agent,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": response},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+
+        def chunks():
+            for i, word in enumerate(response.split(" ")):
+                time.sleep(self.token_interval)
+                yield {
+                    "object": "chat.completion.chunk",
+                    "model": agent,
+                    "choices": [
+                        {"index": 0, "delta": {"content": f" {word}" if i else word}}
+                    ],
+                }
+
+        return 200, chunks()
+
+    def learn(self, agent, source, body, **kwargs):
+        return 200, {"message": f"Agent learned the content from {source}."}
+
+    def query(self, body, **kwargs):
+        limit = int(body.get("limit", 10))
+        return 200, {"memories": self.data.memories[:limit]}
+
+    def get_conversations(self, **kwargs):
+        return 200, {"conversations": list(self.data.conversations)}
+
+    def get_conversation(self, body, **kwargs):
+        history = self.data.conversations.get(body.get("conversation_name"), [])
+        limit = int(body.get("limit", 100))
+        page = int(body.get("page", 1))
+        newest_first = history[::-1]
+        return 200, {
+            "conversation_history": newest_first[(page - 1) * limit : page * limit]
+        }
+
+    def new_conversation(self, body, **kwargs):
+        name = body["conversation_name"]
+        self.data.conversations[name] = list(body.get("conversation_content", []))
+        return 200, {"conversation_history": self.data.conversations[name]}
+
+    def rename_conversation(self, body, **kwargs):
+        name = body.get("new_conversation_name", "-")
+        self.data.conversations[name] = self.data.conversations.pop(
+            body["conversation_name"], []
+        )
+        return 200, {"conversation_name": name}
+
+    def delete_conversation(self, body, **kwargs):
+        self.data.conversations.pop(body.get("conversation_name"), None)
+        return 200, {"message": "Conversation deleted"}
+
+    def new_message(self, body, **kwargs):
+        self.append(body["conversation_name"], body["role"], body["message"])
+        return 200, {"message": "Message added"}
+
+    def get_chains(self, **kwargs):
+        return 200, list(self.data.chains)
+
+    def add_chain(self, body, **kwargs):
+        self.data.chains[body["chain_name"]] = []
+        return 200, {"message": f"Chain '{body['chain_name']}' created."}
+
+    def import_chain(self, body, **kwargs):
+        steps = body.get("steps", {})
+        self.data.chains[body["chain_name"]] = (
+            steps.get("steps", []) if isinstance(steps, dict) else steps
+        )
+        return 200, {"message": f"Chain '{body['chain_name']}' imported."}
+
+    def get_chain(self, chain, **kwargs):
+        if chain not in self.data.chains:
+            return 404, {"detail": "Chain not found"}
+        return 200, {"chain": {"chain_name": chain, "steps": self.data.chains[chain]}}
+
+    def rename_chain(self, chain, body, **kwargs):
+        self.data.chains[body["new_name"]] = self.data.chains.pop(chain, [])
+        return 200, {"message": "Chain renamed"}
+
+    def delete_chain(self, chain, **kwargs):
+        self.data.chains.pop(chain, None)
+        return 200, {"message": f"Chain '{chain}' deleted."}
+
+    def get_chain_args(self, chain, **kwargs):
+        return 200, {"chain_args": ["user_input"]}
+
+    def get_chain_responses(self, chain, **kwargs):
+        return 200, {"chain": {}}
+
+    def run_chain(self, chain, body, step=None, **kwargs):
+        return 200, f"Chain {chain} response: {self.data.text(40)}"
+
+    def add_step(self, chain, body, **kwargs):
+        self.data.chains.setdefault(chain, []).append(
+            {key: body[key] for key in ["agent_name", "prompt_type", "prompt"]}
+            | {"step": int(body["step_number"])}
+        )
+        return 200, {"message": f"Step {body['step_number']} added."}
+
+    def update_step(self, chain, step, body, **kwargs):
+        for item in self.data.chains.get(chain, []):
+            if item["step"] == int(step):
+                item.update(
+                    {key: body[key] for key in ["agent_name", "prompt_type", "prompt"]}
+                )
+        return 200, {"message": f"Step {step} updated."}
+
+    def delete_step(self, chain, step, **kwargs):
+        self.data.chains[chain] = [
+            item
+            for item in self.data.chains.get(chain, [])
+            if item["step"] != int(step)
+        ]
+        return 200, {"message": f"Step {step} deleted."}
+
+    def get_categories(self, **kwargs):
+        return 200, {"prompt_categories": list(self.data.prompts)}
+
+    def get_prompts(self, category, **kwargs):
+        return 200, {"prompts": list(self.data.prompts.setdefault(category, {}))}
+
+    def add_prompt(self, category, body, **kwargs):
+        self.data.prompts.setdefault(category, {})[body["prompt_name"]] = body["prompt"]
+        return 200, {"message": f"Prompt '{body['prompt_name']}' added."}
+
+    def get_prompt(self, category, prompt, **kwargs):
+        return 200, {"prompt": self.data.prompts.get(category, {}).get(prompt, "")}
+
+    def update_prompt(self, category, prompt, body, **kwargs):
+        self.data.prompts.setdefault(category, {})[prompt] = body["prompt"]
+        return 200, {"message": f"Prompt '{prompt}' updated."}
+
+    def rename_prompt(self, category, prompt, body, **kwargs):
+        prompts = self.data.prompts.setdefault(category, {})
+        prompts[body["prompt_name"]] = prompts.pop(prompt, "")
+        return 200, {"message": "Prompt renamed"}
+
+    def delete_prompt(self, category, prompt, **kwargs):
+        self.data.prompts.get(category, {}).pop(prompt, None)
+        return 200, {"message": f"Prompt '{prompt}' deleted."}
+
+    def get_prompt_args(self, category, prompt, **kwargs):
+        content = self.data.prompts.get(category, {}).get(prompt, "")
+        return 200, {"prompt_args": re.findall(r"\{(\w+)\}", content)}
+
+    def get_extensions(self, **kwargs):
+        return 200, {"extensions": self.data.extensions}
+
+    def get_extension_settings(self, **kwargs):
+        return 200, {
+            "extension_settings": {
+                extension["extension_name"]: {key: "" for key in extension["settings"]}
+                for extension in self.data.extensions
+            }
+        }
+
+    def get_command_args(self, command, **kwargs):
+        return 200, {"command_args": {"query": ""}}
+
+
+def make_handler(stand_in: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def handle_request(self):
+            if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+                raw = self.read_chunks()
+            else:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+            with stand_in.lock:
+                stand_in.received_bytes += len(raw)
+            if stand_in.upload_bandwidth and raw:
+                # Request bodies share one link of the given megabytes per second.
+                with stand_in.link:
+                    time.sleep(len(raw) / (stand_in.upload_bandwidth * 1e6))
+            # Like AGiXT, a stand-in without content codings ignores Content-Encoding
+            # and fails to parse a compressed body.
+            coding = self.headers.get("Content-Encoding", "identity").strip().lower()
+            if raw and coding != "identity" and stand_in.content_codings:
+                if coding not in stand_in.content_codings:
+                    self.send_json(415, {"detail": f"Unsupported encoding {coding}"})
+                    return
+                raw = decode_body(raw, coding)
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                self.send_json(422, {"detail": "JSON decode error"})
+                return
+            path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+            status, payload = stand_in.dispatch(self.command, path, self.headers, body)
+            if not isinstance(payload, (dict, list, str)):
+                self.send_events(status, payload)
+                return
+            self.send_json(status, payload)
+
+        def send_json(self, status: int, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if stand_in.content_codings:
+                # Advertises the codings it accepts in request bodies (RFC 7694).
+                self.send_header("Accept-Encoding", ", ".join(stand_in.content_codings))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_chunks(self) -> bytes:
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip any trailers up to the blank line that ends the body.
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+
+        def send_events(self, status: int, events):
+            self.send_response(status)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in events:
+                self.send_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.send_chunk(b"data: [DONE]\n\n")
+            self.send_chunk(b"")
+
+        def send_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_request
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start(port: int = 0, host: str = "127.0.0.1", **options) -> ThreadingHTTPServer:
+    """
+    Starts the stand-in on a background thread and returns the server. Port 0 picks a
+    free port; the chosen one is `server.server_address[1]`. Remaining options are
+    `latency`, `errors`, `token`, `token_interval`, `content_codings`,
+    `upload_bandwidth` and the `Fixtures` sizes.
+    """
+    latency = options.pop("latency", None)
+    errors = options.pop("errors", None)
+    token = options.pop("token", TOKEN)
+    token_interval = options.pop("token_interval", 0.02)
+    content_codings = options.pop("content_codings", None)
+    upload_bandwidth = options.pop("upload_bandwidth", None)
+    stand_in = StandIn(
+        Fixtures(**options),
+        latency=latency,
+        errors=errors,
+        token=token,
+        token_interval=token_interval,
+        content_codings=content_codings,
+        upload_bandwidth=upload_bandwidth,
+    )
+    server = ThreadingHTTPServer((host, port), make_handler(stand_in))
+    server.daemon_threads = True
+    server.stand_in = stand_in
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7437)
+    parser.add_argument("--token", default=TOKEN)
+    parser.add_argument("--agents", type=int, default=5)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--chains", type=int, default=10)
+    parser.add_argument("--chain-steps", type=int, default=5)
+    parser.add_argument("--prompts", type=int, default=20)
+    parser.add_argument("--extensions", type=int, default=10)
+    parser.add_argument("--memories", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency",
+        action="append",
+        help='Per-route latency in seconds, e.g. "GET /api/agent*=0.2" or "/api/*=0.05-0.3".',
+    )
+    parser.add_argument(
+        "--errors",
+        action="append",
+        help='Per-route error rate and status, e.g. "POST /api/agent/*/prompt=0.1:503".',
+    )
+    parser.add_argument(
+        "--token-interval",
+        type=float,
+        default=0.02,
+        help="Seconds between streamed chat completion chunks.",
+    )
+    parser.add_argument(
+        "--content-codings",
+        type=lambda value: [coding for coding in value.split(",") if coding],
+        default=None,
+        help="Comma-separated codings accepted in compressed request bodies, by "
+        f"default {','.join(CONTENT_CODINGS)}. Pass '' to ignore Content-Encoding "
+        "like AGiXT does.",
+    )
+    parser.add_argument(
+        "--upload-bandwidth",
+        type=float,
+        default=None,
+        help="Megabytes per second of request bodies, shared by all requests.",
+    )
+    args = parser.parse_args()
+    server = start(**vars(args))
+    print(f"AGiXT stand-in listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()